@@ -0,0 +1,78 @@
+"""Documentación OpenAPI de la API.
+
+``drf_yasg`` se importa solo cuando se sirve la documentación por primera vez,
+así los workers que nunca la sirven no pagan su importación al arrancar. El
+esquema se lee del archivo generado con ``manage.py generate_schema`` y, si no
+existe, se genera una sola vez por proceso.
+"""
+import functools
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+SCHEMA_CONTENT_TYPES = {
+    '.json': 'application/json',
+    '.yaml': 'application/yaml',
+}
+
+
+def get_schema_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Documentación de API",
+        default_version='v0.1',
+        description="Documentación de API de tareas",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@snippets.local"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_view():
+    from drf_yasg.views import get_schema_view as yasg_schema_view
+    from rest_framework import permissions
+
+    return yasg_schema_view(
+        get_schema_info(),
+        public=True,
+        permission_classes=[permissions.AllowAny],
+    )
+
+
+def get_schema_path(format):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'swagger{format}'
+
+
+def generate_schema(format):
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(get_schema_info()).get_schema(request=None, public=True)
+    codec = OpenAPICodecJson(validators=[]) if format == '.json' else OpenAPICodecYaml(validators=[])
+    return codec.encode(schema)
+
+
+@functools.lru_cache(maxsize=None)
+def load_schema(format):
+    path = get_schema_path(format)
+    if path.exists():
+        return path.read_bytes()
+    return generate_schema(format)
+
+
+def schema_file_view(request, format):
+    return HttpResponse(load_schema(format), content_type=SCHEMA_CONTENT_TYPES[format])
+
+
+@functools.lru_cache(maxsize=None)
+def _ui_view(renderer):
+    return get_schema_view().with_ui(renderer, cache_timeout=settings.OPENAPI_UI_CACHE_TIMEOUT)
+
+
+def schema_ui_view(renderer):
+    def view(request, *args, **kwargs):
+        return _ui_view(renderer)(request, *args, **kwargs)
+    return view
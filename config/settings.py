@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,9 +46,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tareas.middleware.PerformanceMiddleware',
+    'tareas.middleware.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,17 +79,41 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+ASGI_APPLICATION = 'config.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # django.db.backends.sqlite3 más la opción transaction_mode (tareas/backends/sqlite3)
+        'ENGINE': 'tareas.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Conexiones persistentes entre peticiones; se revisan antes de reutilizarlas
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 5,
+            # Las transacciones toman el bloqueo de escritura al empezar y esperan
+            # busy_timeout en lugar de fallar al pasar de lectura a escritura.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# PRAGMAs aplicados a cada conexión SQLite (tareas.db.configure_sqlite_connection).
+# WAL deja que las lecturas sigan mientras otro proceso escribe, y con
+# synchronous=NORMAL cada commit ya no espera un fsync.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -136,6 +163,9 @@ CORS_ORIGIN_ALLOW_ALL = True
 
 
 # settings.py
+# Reutiliza las conexiones SMTP entre envíos (tareas/email_backends.py)
+EMAIL_BACKEND = 'tareas.email_backends.PooledSMTPEmailBackend'
+
 EMAIL_HOST = 'smtp.gmail.com'
 
 EMAIL_PORT = 587
@@ -144,4 +174,180 @@ EMAIL_HOST_USER = 'lokokuerdomayo@gmail.com'
 
 EMAIL_HOST_PASSWORD = 'htfsvrssnpgdpvln'
 
-EMAIL_USE_TLS = True
\ No newline at end of file
+EMAIL_USE_TLS = True
+
+EMAIL_TIMEOUT = 30
+
+# Pool de conexiones SMTP por proceso: conexiones libres por servidor, segundos
+# sin uso tras los que se cierran y tras los que se comprueban con NOOP.
+EMAIL_POOL_SIZE = 2
+
+EMAIL_POOL_IDLE_TIMEOUT = 60
+
+EMAIL_POOL_NOOP_AFTER = 5
+
+# Outbox de correos: las vistas solo guardan el correo, ``manage.py send_outbox`` lo envía.
+EMAIL_OUTBOX_BATCH_SIZE = 50
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_BACKOFF_SECONDS = 30
+
+EMAIL_OUTBOX_BACKOFF_MAX_SECONDS = 3600
+
+# Segundos que un lote reclamado por ``send_outbox`` queda reservado; si el
+# proceso muere sin terminarlo, pasado este tiempo otro lo vuelve a enviar.
+EMAIL_OUTBOX_CLAIM_LEASE = 300
+
+# Avisos de cambios en tareas (tareas/notifications.py): 'digest' junta los de
+# cada usuario en un correo por ventana de NOTIFICATION_DIGEST_WINDOW segundos;
+# 'immediate' envía un correo por cada cambio.
+NOTIFICATION_MODE = 'digest'
+
+NOTIFICATION_DIGEST_WINDOW = 300
+
+# Máximo de elementos aceptados por bulk-create-user/ y bulk-create-tarea/
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Cabecera Idempotency-Key en los endpoints de creación: cuánto se guarda la
+# primera respuesta y cuánto espera una petición repetida a que termine la original.
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+
+# Segundos tras los que una llave en proceso se da por abandonada y otra petición
+# la toma. Debe superar el timeout de gunicorn (120 s): hasta ahí el worker puede
+# seguir trabajando.
+IDEMPOTENCY_CLAIM_LEASE = 150
+
+# Control de admisión (tareas.middleware.AdmissionControlMiddleware): lo que
+# supere estos límites recibe 429 con Retry-After.
+# Escrituras simultáneas por proceso de gunicorn (None desactiva el límite).
+# Tiene que quedar por debajo de los hilos del worker (GUNICORN_THREADS, ver
+# gunicorn.conf.py) o nunca se alcanza: con la mitad, el resto atiende lecturas.
+ADMISSION_MAX_CONCURRENT_WRITES = max(1, int(os.environ.get('GUNICORN_THREADS', 4)) // 2)
+
+# Token buckets por nombre de ruta de tareas/api/urls.py. Cada límite es
+# (tokens por segundo, ráfaga máxima); 'client' se aplica por IP y 'route' a
+# la ruta completa. Los límites son aproximados: el bucket se lee y se escribe
+# en el caché sin bloqueo (FileBasedCache no tiene operaciones atómicas), así
+# que con varios workers a la vez puede pasar alguna petición de más.
+RATE_LIMITS = {
+    'create-user': {'client': (2, 10), 'route': (20, 40)},
+    'bulk-create-user': {'client': (0.2, 2), 'route': (1, 4)},
+    'update-user': {'client': (2, 10), 'route': (20, 40)},
+    'delete-user': {'client': (2, 10), 'route': (20, 40)},
+    'create-tarea': {'client': (5, 20), 'route': (30, 60)},
+    'bulk-create-tarea': {'client': (0.2, 2), 'route': (1, 4)},
+    'update-tarea': {'client': (5, 20), 'route': (30, 60)},
+    'delete-tarea': {'client': (5, 20), 'route': (30, 60)},
+    'export-tarea': {'client': (0.1, 2)},
+}
+
+# Cabecera de META con la IP real del cliente cuando hay un proxy delante
+# (p. ej. 'HTTP_X_FORWARDED_FOR'); si es None se usa REMOTE_ADDR.
+RATE_LIMIT_CLIENT_IP_HEADER = None
+
+
+# Caché de los listados (read-user/, read-tarea/). Se usa un backend de archivos
+# para que todos los workers de gunicorn compartan los contadores de versión.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'taskhome-cache',
+    }
+}
+
+LIST_CACHE_TIMEOUT = 300
+
+# read-user-tareas/: tareas abiertas por usuario (?tareas_limit= hasta USER_TAREAS_MAX_LIMIT)
+USER_TAREAS_LIMIT = 20
+
+USER_TAREAS_MAX_LIMIT = 100
+
+# Filas leídas por consulta en export-tarea/
+EXPORT_CHUNK_SIZE = 2000
+
+# manage.py archive_tareas: las tareas terminadas sin cambios en ARCHIVE_AFTER_DAYS
+# días pasan a HomeworkArchive, ARCHIVE_BATCH_SIZE por transacción.
+ARCHIVE_AFTER_DAYS = 30
+
+ARCHIVE_BATCH_SIZE = 500
+
+# changes/: filas por tabla en cada respuesta (?limit= hasta SYNC_MAX_PAGE_SIZE)
+# y segundos que el token se queda atrás por escrituras aún sin confirmar.
+SYNC_PAGE_SIZE = 500
+
+SYNC_MAX_PAGE_SIZE = 2000
+
+SYNC_SETTLE_SECONDS = 2
+
+# Feed SSE de tareas (tareas/sse.py), servido por config/asgi.py.
+# 'database': los eventos pasan por la tabla HomeworkEvent y cada proceso ASGI
+# la lee cada SSE_POLL_INTERVAL segundos; 'memory': solo dentro del mismo proceso.
+SSE_PATH = '/user/stream-tarea/'
+
+# Con False las escrituras no registran eventos y el feed queda sin cambios
+SSE_ENABLED = True
+
+SSE_BROADCAST_BACKEND = 'database'
+
+SSE_POLL_INTERVAL = 0.5
+
+# Eventos leídos de HomeworkEvent por consulta del poller
+SSE_POLL_BATCH_SIZE = 500
+
+SSE_HEARTBEAT_SECONDS = 15
+
+SSE_RETRY_MS = 3000
+
+# Conexiones abiertas por proceso y eventos pendientes por conexión
+SSE_MAX_CONNECTIONS = 1000
+
+SSE_QUEUE_SIZE = 100
+
+# Eventos que se repiten como máximo al reconectar con Last-Event-ID
+SSE_REPLAY_LIMIT = 1000
+
+# Segundos que se conservan las filas de HomeworkEvent
+SSE_EVENT_RETENTION = 60 * 60 * 24
+
+# Cada cuántos segundos send_outbox borra los eventos vencidos
+SSE_PRUNE_INTERVAL = 60 * 60
+
+# Límites (en segundos) de los histogramas de latencia publicados en /metrics/
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# /metrics/ responde 403 salvo con 'Authorization: Bearer <METRICS_TOKEN>'. Sin
+# token solo lo leen estas IPs; detrás de un proxy REMOTE_ADDR es el proxy, así
+# que ahí hay que definir el token.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'tareas.api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
+# Documentación OpenAPI: ``manage.py generate_schema`` escribe el esquema en
+# OPENAPI_SCHEMA_DIR (dentro de STATIC_ROOT, así whitenoise también lo sirve en
+# /static/openapi/). Las páginas de Swagger/ReDoc lo leen desde /swagger.json.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+OPENAPI_SCHEMA_DIR = STATIC_ROOT / 'openapi'
+
+OPENAPI_UI_CACHE_TIMEOUT = 60 * 60 * 24
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
@@ -0,0 +1,35 @@
+"""Settings para los workers que solo atienden la API (``DJANGO_SETTINGS_MODULE=config.settings_api``).
+
+Parten de ``config.settings`` y dejan fuera lo que la API no usa: el admin,
+la documentación (``drf_yasg``), sesiones, mensajes, archivos estáticos y la
+API navegable. Así cada worker arranca más rápido y ocupa menos memoria. El
+admin y ``/swagger/`` se sirven desde otro proceso con ``config.settings``.
+"""
+from config.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'corsheaders',
+    'tareas',
+]
+
+MIDDLEWARE = [
+    'tareas.middleware.PerformanceMiddleware',
+    'tareas.middleware.AdmissionControlMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'config.urls_api'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'tareas.api.renderers.JSONRenderer',
+    ],
+    # Sin sesiones ni usuarios: no hace falta importar django.contrib.auth
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -0,0 +1,38 @@
+"""Settings con los que ``manage.py loadtest`` arranca gunicorn.
+
+La aplicación es la de ``config.settings``, pero sobre la base SQLite temporal
+que prepara el comando (``LOADTEST_DATABASE``), sin enviar correos y sin
+límites de peticiones: los clientes de la prueba repiten las mismas rutas a
+propósito.
+"""
+import os
+from pathlib import Path
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import DATABASES
+
+# Con DEBUG cada consulta se guarda en connection.queries y se mediría de más
+DEBUG = False
+
+DATABASES = {
+    'default': {**DATABASES['default'], 'NAME': os.environ['LOADTEST_DATABASE']},
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(os.environ['LOADTEST_DATABASE']).parent / 'cache',
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
+
+RATE_LIMITS = {}
+
+# Los errores 500 quedan en el log de gunicorn de cada corrida
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'django.request': {'handlers': ['console'], 'level': 'ERROR'}},
+}
@@ -0,0 +1,9 @@
+"""URLs de los workers de solo API (``config.settings_api``): sin admin ni documentación."""
+from django.urls import path, include
+from tareas.metrics import metrics_view
+
+
+urlpatterns = [
+    path('user/', include('tareas.api.urls')),
+    path('metrics/', metrics_view, name='metrics'),
+]
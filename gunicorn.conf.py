@@ -0,0 +1,56 @@
+"""Configuración de gunicorn para producción (``gunicorn config.wsgi -c gunicorn.conf.py``).
+
+Todos los valores se pueden ajustar con variables de entorno.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# gthread: cada worker atiende varias peticiones con hilos mientras espera a
+# SQLite; sync sigue disponible con GUNICORN_WORKER_CLASS=sync.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+cpu_count = multiprocessing.cpu_count()
+if worker_class == 'gthread':
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+else:
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count * 2 + 1))
+    threads = 1
+
+# Django se importa una vez en el maestro y los workers comparten esa memoria.
+preload_app = True
+
+# Reciclar workers de a poco; el jitter evita que se reinicien todos a la vez.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    from tareas.warmup import preload
+
+    preload()
+
+
+def pre_fork(server, worker):
+    from tareas.warmup import close_connections
+
+    close_connections()
+
+
+def post_fork(server, worker):
+    from tareas.warmup import warmup_worker
+
+    try:
+        warmup_worker()
+    except Exception:
+        # Sin calentar el worker igual puede atender; la primera petición será más lenta.
+        server.log.exception('No se pudo calentar el worker %s', worker.pid)
@@ -0,0 +1,27 @@
+"""Configuración de gunicorn para el feed SSE (``gunicorn config.asgi:application -c gunicorn_stream.conf.py``).
+
+Va aparte de ``gunicorn.conf.py``: gunicorn carga ese archivo solo si no se
+le pasa otro con ``-c``, y sus valores (preload, reciclado de workers, un
+worker por núcleo) están pensados para la API WSGI, no para conexiones que
+quedan abiertas.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Cada worker atiende miles de conexiones con corrutinas y lee HomeworkEvent
+# por su cuenta: con pocos alcanza y se consulta menos la base.
+workers = int(os.environ.get('STREAM_WORKERS', 1))
+
+# Reciclar un worker cortaría todas sus conexiones abiertas a la vez.
+max_requests = 0
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# Al reiniciar, los clientes vuelven solos con Last-Event-ID: no hace falta esperarlos.
+graceful_timeout = 10
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
@@ -1,6 +1,11 @@
 from django.contrib import admin
-from tareas.models import User, Homework
+from tareas.models import User, Homework, HomeworkArchive, OutboxEmail, IdempotencyKey, HomeworkEvent, Notification
 # Register your models here.
 
 admin.site.register(User)
-admin.site.register(Homework)
\ No newline at end of file
+admin.site.register(Homework)
+admin.site.register(HomeworkArchive)
+admin.site.register(OutboxEmail)
+admin.site.register(IdempotencyKey)
+admin.site.register(HomeworkEvent)
+admin.site.register(Notification)
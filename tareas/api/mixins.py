@@ -0,0 +1,151 @@
+import datetime
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.http import QueryDict
+from django.utils import timezone
+from django.utils.cache import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from tareas.cache import get_list_version
+from tareas.models import IdempotencyKey
+
+
+class CachedListMixin:
+    """Guarda la respuesta del listado en caché y responde 304 a ``If-None-Match``.
+
+    La llave incluye la versión del listado, que las señales de los modelos
+    incrementan en cada cambio; así la validación del ETag no toca la base de datos.
+    """
+    cache_name = None
+
+    def get_cache_digest(self, request):
+        params = sorted(request.query_params.lists())
+        raw = f'{self.cache_name}|{get_list_version(self.cache_name)}|{request.get_host()}|' \
+              f'{request.accepted_renderer.format}|{params}'
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        digest = self.get_cache_digest(request)
+        etag = f'"{digest}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        key = f'tareas:list:{digest}'
+        data = cache.get(key)
+        if data is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, getattr(settings, 'LIST_CACHE_TIMEOUT', 300))
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+
+class IdempotentCreateMixin:
+    """Repite la primera respuesta a los POST que llegan con la misma ``Idempotency-Key``.
+
+    La llave se reclama con un INSERT contra un índice único, así solo una de
+    varias peticiones simultáneas ejecuta el serializer; las demás esperan su
+    resultado hasta ``IDEMPOTENCY_WAIT_TIMEOUT`` y si no, responden 409. Solo se
+    guardan las respuestas exitosas: si la petición falla la llave se libera y
+    el cliente puede reintentar. Si el worker muere con la llave en proceso,
+    pasado ``IDEMPOTENCY_CLAIM_LEASE`` la toma la siguiente repetición.
+    """
+    idempotency_header = 'Idempotency-Key'
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return super().post(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response({'detail': 'La llave de idempotencia es demasiado larga.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        route = request.resolver_match.url_name
+        request_hash = self.get_request_hash(request)
+        record, claimed = self.claim_idempotency_key(key, route, request_hash)
+        if record.request_hash != request_hash:
+            return Response({'detail': 'La llave de idempotencia ya se usó con otra petición.'},
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if record.status == 'D':
+            return self.replay_response(record)
+        if not claimed:
+            return Response({'detail': 'Hay otra petición en curso con la misma llave de idempotencia.'},
+                            status=status.HTTP_409_CONFLICT)
+
+        # Si otra petición tomó la llave por vencida, ya no se toca su registro
+        claim = IdempotencyKey.objects.filter(pk=record.pk, claimed_at=record.claimed_at)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception:
+            claim.delete()
+            raise
+        if response.status_code >= 400:
+            claim.delete()
+            return response
+
+        claim.update(
+            status='D',
+            response_status=response.status_code,
+            response_body=response.data,
+            response_headers={
+                header: value for header, value in response.items() if header.lower() != 'content-type'},
+        )
+        return response
+
+    @staticmethod
+    def get_request_hash(request):
+        data = request.data
+        if isinstance(data, QueryDict):
+            data = sorted(data.lists())
+        raw = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def claim_idempotency_key(self, key, route, request_hash):
+        """Devuelve ``(registro, reclamada)``; si ``reclamada`` es cierto esta petición hace el trabajo."""
+        ttl = datetime.timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 60 * 60 * 24))
+        lease = datetime.timedelta(seconds=getattr(settings, 'IDEMPOTENCY_CLAIM_LEASE', 150))
+        timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 10)
+        interval = getattr(settings, 'IDEMPOTENCY_POLL_INTERVAL', 0.1)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            # Primero se busca: una repetición se responde con una sola consulta.
+            record = IdempotencyKey.objects.filter(key=key, route=route).first()
+            if record is None:
+                try:
+                    with transaction.atomic():
+                        record = IdempotencyKey.objects.create(key=key, route=route, request_hash=request_hash)
+                    return record, True
+                except IntegrityError:
+                    # Otra petición la reclamó entre la consulta y el INSERT.
+                    continue
+            if record.created_at < timezone.now() - ttl:
+                record.delete()
+                continue
+            if record.status == 'P' and record.request_hash == request_hash \
+                    and record.claimed_at < timezone.now() - lease:
+                # La petición que la reclamó no terminó ni la liberó: se toma con un
+                # UPDATE condicional, así solo una de varias repeticiones lo logra.
+                claimed_at = timezone.now()
+                if IdempotencyKey.objects.filter(
+                        pk=record.pk, status='P', claimed_at=record.claimed_at).update(claimed_at=claimed_at):
+                    record.claimed_at = claimed_at
+                    return record, True
+                continue
+            if record.status == 'D' or record.request_hash != request_hash or time.monotonic() >= deadline:
+                return record, False
+            time.sleep(interval)
+
+    @staticmethod
+    def replay_response(record):
+        response = Response(record.response_body, status=record.response_status, headers=record.response_headers)
+        response['Idempotent-Replayed'] = 'true'
+        return response
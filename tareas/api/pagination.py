@@ -0,0 +1,22 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Paginación por cursor sobre la llave primaria (``?cursor=...&limit=...``).
+
+    El cursor guarda el último ``id`` visto, así que cada página se resuelve con
+    ``WHERE id > ... LIMIT n`` y cuesta lo mismo sin importar su profundidad.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 200
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        # El orden es único, así que los cursores que generamos nunca llevan
+        # OFFSET; uno que lo traiga está armado a mano y obligaría a recorrer filas.
+        if cursor is not None and cursor.offset:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
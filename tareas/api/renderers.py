@@ -0,0 +1,101 @@
+import abc
+import csv
+import json
+
+from rest_framework import renderers
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+from tareas.metrics import track
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` de DRF que usa ``orjson`` cuando está instalado.
+
+    La salida es idéntica byte a byte a la de DRF: las fechas y los tipos que
+    ``orjson`` no conoce pasan por el ``JSONEncoder`` de DRF, y si la respuesta
+    pide indentación o la configuración no es la compacta por defecto se usa
+    el renderer original. El tiempo se reporta como ``render`` en ``Server-Timing``.
+    """
+    orjson_options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with track('render'):
+            if data is None or not self.can_use_orjson(accepted_media_type, renderer_context):
+                return super().render(data, accepted_media_type, renderer_context)
+            try:
+                ret = orjson.dumps(data, default=self.encoder_class().default, option=self.orjson_options)
+            except (orjson.JSONEncodeError, TypeError):
+                return super().render(data, accepted_media_type, renderer_context)
+            # Igual que DRF: U+2028/U+2029 se escapan para que el JSON sea JavaScript válido
+            return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+    def can_use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and self.ensure_ascii is False
+            and self.compact
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+
+
+class StreamingRenderer(BaseRenderer, metaclass=abc.ABCMeta):
+    """Renderer que también sabe codificar una secuencia de filas una por una."""
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = [data]
+        return b''.join(self.iter_render(data or []))
+
+    @abc.abstractmethod
+    def iter_render(self, rows):
+        """Devuelve los bytes de cada fila de ``rows`` a medida que se leen."""
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def iter_render(self, rows):
+        for row in rows:
+            yield json.dumps(
+                row, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':')
+            ).encode(self.charset) + b'\n'
+
+
+class _LineBuffer:
+    def write(self, value):
+        return value
+
+
+def _flatten(row, prefix=''):
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+class CSVRenderer(StreamingRenderer):
+    """CSV con una columna por campo; los objetos anidados se aplanan como ``user.id``."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def iter_render(self, rows):
+        writer = csv.writer(_LineBuffer())
+        header = None
+        for row in rows:
+            row = _flatten(row)
+            if header is None:
+                header = list(row)
+                yield writer.writerow(header).encode(self.charset)
+            yield writer.writerow([row.get(column) for column in header]).encode(self.charset)
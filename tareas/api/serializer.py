@@ -1,10 +1,68 @@
 from rest_framework import serializers
-from django.core.mail import send_mail
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery
+from django.utils import timezone
 import re
+import base64
 import datetime
-from tareas.models import User, Homework
+import json
+from tareas.archive import CombinedQuerySet
+from tareas.cache import invalidate_lists
+from tareas.email_utils import enqueue_mass_mail
+from tareas.events import event_type, record_homework_events
+from tareas.notifications import digest_enabled, notify, record_notifications
+from tareas.models import User, Homework, HomeworkArchive, normalize_title
+
+
+HOMEWORK_STATUS_LABELS = dict(Homework.STATUS_CHOICES)
+
+EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
+
+PHONE_NUMBER_RE = re.compile(r'^\+?\d{0,2}\s?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}$')
+
+
+def bulk_insert(model, objs):
+    """``bulk_create`` que deja a cada objeto con su ``pk``, también en SQLite."""
+    with transaction.atomic():
+        model.objects.bulk_create(objs)
+        if objs and objs[0].pk is None:
+            # SQLite no devuelve los ids del INSERT. Dentro de la transacción
+            # nadie más puede escribir, así que los últimos ids son los nuestros.
+            pks = model.objects.order_by('-pk').values_list('pk', flat=True)[:len(objs)]
+            for obj, pk in zip(objs, reversed(pks)):
+                obj.pk = pk
+    return objs
+
+
+UNIQUE_VIOLATION_MESSAGES = {
+    'tareas_user_phone_number_unique': 'El número de teléfono ya está en uso.',
+    'tareas_user_email_unique': 'El correo electrónico ya está en uso.',
+}
+
+
+def unique_violation_message(exc):
+    """Mensaje para el usuario cuando un INSERT/UPDATE choca con un índice único de ``User``.
+
+    La restricción se reconoce por su nombre; SQLite no nombra los índices
+    parciales y en su lugar informa las columnas (``tareas_user.email``).
+    """
+    message = str(exc)
+    for constraint in User._meta.constraints:
+        columns = ', '.join(f'{User._meta.db_table}.{field}' for field in constraint.fields)
+        if constraint.name in message or columns in message:
+            return UNIQUE_VIOLATION_MESSAGES[constraint.name]
+    raise exc
+
+
+def validate_bulk_items(items):
+    if not isinstance(items, list):
+        raise serializers.ValidationError('Debe enviar una lista de elementos.')
+    max_items = getattr(settings, 'BULK_CREATE_MAX_ITEMS', 1000)
+    if len(items) > max_items:
+        raise serializers.ValidationError(f'No puede enviar más de {max_items} elementos por lote.')
+    return items
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -12,6 +70,10 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = '__all__'
 
+    # Mismas columnas y en el mismo orden que ``fields = '__all__'``; con
+    # ``values(*values_fields)`` cada fila ya es la representación del usuario.
+    values_fields = tuple(field.name for field in User._meta.concrete_fields)
+
     @staticmethod
     def validate_name(name):
         if name == '':
@@ -35,7 +97,7 @@ class UserSerializer(serializers.ModelSerializer):
     def validate_email(value):
         if not value:
             raise serializers.ValidationError('Tiene que indicar un correo.')
-        elif not re.match(r"[^@]+@[^@]+\.[^@]+", value):
+        elif not EMAIL_RE.match(value):
             raise serializers.ValidationError(
                 'El correo electrónico no es válido')
         return value
@@ -46,10 +108,7 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Tiene que indicar un número de telefono.')
 
-        pattern = re.compile(
-            r'^\+?\d{0,2}\s?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}$')
-
-        if not pattern.match(phone_number):
+        if not PHONE_NUMBER_RE.match(phone_number):
             raise serializers.ValidationError(
                 'El número de teléfono es inválido.')
 
@@ -64,35 +123,110 @@ class UserSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        phone_number = validated_data.get('phone_number')
-        email = validated_data.get('email')
+        # La unicidad de teléfono y correo la garantizan las restricciones de
+        # la base de datos; comprobarla antes con una consulta dejaba una
+        # carrera entre dos peticiones simultáneas.
+        try:
+            with transaction.atomic():
+                # Usuario inactivo con el mismo nombre, solo si nadie usa ya el
+                # correo o el teléfono: si no, el INSERT choca con la restricción.
+                existing_user = User.objects.filter(
+                    *self.contact_free(validated_data), name=validated_data['name'], active=False,
+                ).order_by('pk').first()
+                if existing_user:
+                    existing_user.active = True
+                    existing_user.save(update_fields=['active'])
+                    return existing_user
+
+                user = self.build_user(validated_data)
+                user.save(force_insert=True)
+                return user
+        except IntegrityError as exc:
+            raise serializers.ValidationError(unique_violation_message(exc))
 
-        # Check if phone number or email already exist in other users
-        if phone_number and User.objects.filter(phone_number=phone_number).exists():
-            raise serializers.ValidationError(
-                'El número de teléfono ya está en uso.')
-        if email and User.objects.filter(email=email).exists():
-            raise serializers.ValidationError(
-                'El correo electrónico ya está en uso.')
-
-        # Check if there is an inactive user with the same name
-        existing_user = User.objects.filter(
-            name=validated_data['name'], active=False).first()
-        if existing_user:
-            existing_user.active = True
-            existing_user.save()
-            return existing_user
-
-        name = validated_data.get('name', '').capitalize()
-        last_name = validated_data.get('last_name', '').capitalize()
-        user = User.objects.create(
-            name=name,
-            last_name=last_name,
-            email=email,
-            phone_number=phone_number,
+    @staticmethod
+    def contact_free(validated_data):
+        return [
+            ~Exists(User.objects.filter(**{field: validated_data[field]}))
+            for field in ('email', 'phone_number') if validated_data.get(field)
+        ]
+
+    @staticmethod
+    def build_user(validated_data):
+        return User(
+            name=validated_data.get('name', '').capitalize(),
+            last_name=validated_data.get('last_name', '').capitalize(),
+            email=validated_data.get('email'),
+            phone_number=validated_data.get('phone_number'),
             active=True
         )
-        return user
+
+    def bulk_create(self, items):
+        validate_bulk_items(items)
+
+        errors = []
+        valid = []
+        for index, item in enumerate(items):
+            serializer = UserSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        # Una sola consulta por lote para la unicidad de correo y teléfono
+        emails = {data['email'] for _, data in valid if data.get('email')}
+        phones = {data['phone_number'] for _, data in valid if data.get('phone_number')}
+        taken_emails, taken_phones = set(), set()
+        for email, phone_number in User.objects.filter(
+                Q(email__in=emails) | Q(phone_number__in=phones)).values_list('email', 'phone_number'):
+            taken_emails.add(email)
+            taken_phones.add(phone_number)
+
+        inactive_users = {}
+        names = {data['name'] for _, data in valid if data.get('name')}
+        for user in User.objects.filter(name__in=names, active=False).order_by('-pk'):
+            inactive_users[user.name] = user
+
+        created, reactivated, results = [], [], []
+        for index, data in valid:
+            phone_number = data.get('phone_number')
+            email = data.get('email')
+            if phone_number and phone_number in taken_phones:
+                errors.append({'index': index, 'errors': ['El número de teléfono ya está en uso.']})
+                continue
+            if email and email in taken_emails:
+                errors.append({'index': index, 'errors': ['El correo electrónico ya está en uso.']})
+                continue
+            taken_phones.add(phone_number)
+            taken_emails.add(email)
+
+            existing_user = inactive_users.pop(data.get('name'), None)
+            if existing_user:
+                existing_user.active = True
+                existing_user.updated_at = timezone.now()
+                reactivated.append(existing_user)
+                results.append(existing_user)
+                continue
+
+            user = self.build_user(data)
+            created.append(user)
+            results.append(user)
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_update(reactivated, ['active', 'updated_at'])
+                bulk_insert(User, created)
+                invalidate_lists(User)
+        except IntegrityError as exc:
+            # Otra petición ocupó un correo o teléfono después de la consulta
+            # de arriba; el lote entero se descarta.
+            raise serializers.ValidationError(unique_violation_message(exc))
+
+        errors.sort(key=lambda error: error['index'])
+        return {
+            'created': UserSerializer(results, many=True).data,
+            'errors': errors,
+        }
 
     def update(self, instance, validated_data):
         self.validate_active(instance.active)
@@ -105,7 +239,7 @@ class UserSerializer(serializers.ModelSerializer):
             validated_data['last_name'] = ' '.join(word.capitalize() for word in validated_data['last_name'].split())
 
         instance.__dict__.update(validated_data)
-        instance.save()
+        self.save_unique(instance)
 
         return instance
 
@@ -122,9 +256,17 @@ class UserSerializer(serializers.ModelSerializer):
             elif field == 'active':
                 self.validate_active(value)
                 instance.active = value
-        instance.save()
+        self.save_unique(instance)
         return instance
 
+    @staticmethod
+    def save_unique(instance, **kwargs):
+        try:
+            with transaction.atomic():
+                instance.save(**kwargs)
+        except IntegrityError as exc:
+            raise serializers.ValidationError(unique_violation_message(exc))
+
     @staticmethod
     def delete(instance):
         if instance.status is False:
@@ -136,10 +278,28 @@ class UserSerializer(serializers.ModelSerializer):
             return {'message': 'Usuario eliminado correctamente'}
 
 
+class HomeworkUserField(serializers.PrimaryKeyRelatedField):
+    """Al editar una tarea sin cambiar de usuario reutiliza ``instance.user`` en vez de volver a consultarlo."""
+
+    default_error_messages = {
+        'required': 'Debe asignarle la tarea a un usuario',
+        'does_not_exist': 'El usuario ingresado no existe',
+        'incorrect_type': 'El usuario ingresado no existe',
+    }
+
+    def to_internal_value(self, data):
+        instance = getattr(self.parent, 'instance', None)
+        if isinstance(instance, Homework) and str(data) == str(instance.user_id):
+            return instance.user
+        return super().to_internal_value(data)
+
+
 class HomeworkSerializer(serializers.ModelSerializer):
+    user = HomeworkUserField(queryset=User.objects.all())
+
     class Meta:
         model = Homework
-        fields = '__all__'
+        exclude = ('title_normalized',)
 
     @staticmethod
     def validate_title(title):
@@ -163,10 +323,9 @@ class HomeworkSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def validate_user(user):
+        # ``HomeworkUserField`` ya cargó el usuario; si no existiera habría fallado ahí.
         if not user:
             raise serializers.ValidationError('Debe asignarle la tarea a un usuario')
-        if not User.objects.filter(pk=user.pk).exists():
-            raise serializers.ValidationError('El usuario ingresado no existe')
         return user
 
     def to_representation(self, instance):
@@ -178,22 +337,48 @@ class HomeworkSerializer(serializers.ModelSerializer):
             "status": instance.get_status_display(),
             "user": {
                 'id': instance.user.id,
-                'username': (
-                        str(instance.user.name).split(" ")[0] + " " + str(instance.user.last_name).split(" ")[0]
-                )
+                'username': self.short_username(instance.user.name, instance.user.last_name)
 
             }
         }
 
+    # Columnas que necesita ``values_to_representation``
+    values_fields = ('id', 'title', 'description', 'time', 'status', 'user_id', 'user__name', 'user__last_name')
+
+    @staticmethod
+    def values_to_representation(row):
+        """Igual que ``to_representation`` pero a partir de una fila de ``values(*values_fields)``.
+
+        Evita construir instancias de los modelos en los listados grandes.
+        """
+        return {
+            "id": row['id'],
+            "title": row['title'],
+            "description": row['description'],
+            "time": row['time'],
+            "status": HOMEWORK_STATUS_LABELS.get(row['status']),
+            "user": {
+                'id': row['user_id'],
+                'username': HomeworkSerializer.short_username(row['user__name'], row['user__last_name'])
+            }
+        }
+
+    @staticmethod
+    def short_username(name, last_name):
+        return str(name).split(" ")[0] + " " + str(last_name).split(" ")[0]
+
+    @transaction.atomic
     def create(self, validated_data):
         existing_homework = Homework.objects.filter(
-            title=validated_data['title'], status__in=['C', 'P']).first()
+            title_normalized=normalize_title(validated_data['title']),
+            status__in=['C', 'P']).select_related('user').first()
         if existing_homework:
-            existing_homework.status = validated_data.get('status', existing_homework.status)
-            existing_homework.save()
+            status = validated_data.get('status', existing_homework.status)
+            if status != existing_homework.status:
+                existing_homework.status = status
+                existing_homework.save(update_fields=['status'])
             return existing_homework
 
-
         homework = super().create(validated_data)
 
         # enviar un correo electrónico al usuario asignado a la tarea
@@ -201,11 +386,90 @@ class HomeworkSerializer(serializers.ModelSerializer):
         subject = 'Nueva tarea asignada'
         message = f'Hola {user.name}, se te ha asignado una nueva tarea: {homework.title}'
         email_from = settings.EMAIL_HOST_USER
-        recipient_list = [user.email]
-        send_mail(subject, message, email_from, recipient_list)
+        notify(homework, 'created', subject, message, email_from)
 
         return homework
 
+    def bulk_create(self, items):
+        validate_bulk_items(items)
+
+        # Los usuarios de todo el lote se cargan con una sola consulta
+        user_ids = set()
+        for item in items:
+            try:
+                user_ids.add(int(item.get('user')))
+            except (AttributeError, TypeError, ValueError):
+                pass
+        users = User.objects.in_bulk(user_ids)
+
+        errors = []
+        valid = []
+        for index, item in enumerate(items):
+            serializer = HomeworkBulkItemSerializer(data=item, context={'users': users})
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        # Sin título no hay con qué detectar duplicados: siempre es una tarea nueva
+        titles = {normalize_title(data.get('title')) for data in valid} - {''}
+        open_homeworks = {}
+        for homework in Homework.objects.filter(
+                title_normalized__in=titles, status__in=['C', 'P']).select_related('user').order_by('-pk'):
+            open_homeworks[homework.title_normalized] = homework
+
+        created, updated, results = [], {}, []
+        for data in valid:
+            title_normalized = normalize_title(data.get('title'))
+            existing_homework = open_homeworks.get(title_normalized) if title_normalized else None
+            if existing_homework:
+                existing_homework.status = data.get('status', existing_homework.status)
+                existing_homework.updated_at = timezone.now()
+                if existing_homework.pk:
+                    updated[existing_homework.pk] = existing_homework
+                results.append(existing_homework)
+                continue
+
+            # ``bulk_create`` no pasa por ``Homework.save``
+            homework = Homework(**data, title_normalized=title_normalized)
+            if title_normalized:
+                open_homeworks[title_normalized] = homework
+            created.append(homework)
+            results.append(homework)
+
+        with transaction.atomic():
+            Homework.objects.bulk_update(updated.values(), ['status', 'updated_at'])
+            bulk_insert(Homework, created)
+            invalidate_lists(Homework)
+            # Tampoco pasan por las señales que publican los eventos del feed SSE
+            record_homework_events(
+                [(homework, 'created') for homework in created]
+                + [(homework, event_type(homework)) for homework in updated.values()])
+
+            if digest_enabled():
+                record_notifications([(homework, 'created') for homework in created])
+            else:
+                # Un solo correo por usuario con todas sus tareas nuevas
+                assigned = {}
+                for homework in created:
+                    assigned.setdefault(homework.user, []).append(homework.title)
+                enqueue_mass_mail(
+                    (
+                        'Nuevas tareas asignadas',
+                        f'Hola {user.name}, se te han asignado nuevas tareas:\n' + '\n'.join(
+                            f'- {title}' for title in titles),
+                        settings.EMAIL_HOST_USER,
+                        [user.email],
+                    )
+                    for user, titles in assigned.items()
+                )
+
+        return {
+            'created': HomeworkSerializer(results, many=True).data,
+            'errors': errors,
+        }
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         status = validated_data.get('status')
         if status and status not in ['C', 'P', 'T']:
@@ -214,30 +478,30 @@ class HomeworkSerializer(serializers.ModelSerializer):
         if validated_data.get('title'):
             validated_data['title'] = ' '.join(word.capitalize() for word in validated_data['title'].split())
 
-        # Obtener el usuario asignado a la tarea
-        user = validated_data.get('user', None)
-        if user is not None:
-            instance.user = user
-
-        # Actualizar la instancia y guardarla
-        instance.__dict__.update(validated_data)
-        instance.save()
+        # Actualizar la instancia y guardar solo las columnas que cambiaron
+        changed = []
+        for field, value in validated_data.items():
+            if getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed.append(field)
+        if changed:
+            instance.save(update_fields=changed)
 
         # Obtener los detalles del usuario asignado a la tarea
         user = instance.user
         user_full_name = f"{user.name} {user.last_name}"
-        user_email = user.email
 
-        # Enviar el correo electrónico
+        # Avisar al usuario (por correo inmediato o en su próximo resumen)
         subject = f"La tarea '{instance.title}' ha sido actualizada"
         message = f"Hola {user_full_name},\nLa tarea '{instance.title}' ha sido actualizada.\nGracias,\nEl equipo de Tareas"
         from_email = 'mi_correo_ejemplo@example.com'
-        recipient_list = [user_email]
-        send_mail(subject, message, from_email, recipient_list)
+        event = 'completed' if 'status' in changed and instance.status == 'T' else 'updated'
+        notify(instance, event, subject, message, from_email)
 
         return instance
 
     @staticmethod
+    @transaction.atomic
     def partial_update(instance, validated_data):
         status = validated_data.get('status')
         if status and status not in ['C', 'P', 'T']:
@@ -251,20 +515,20 @@ class HomeworkSerializer(serializers.ModelSerializer):
             elif field == 'status':
                 instance.status = value
                 if value == 'C':
-                    send_mail(
+                    notify(
+                        instance,
+                        'updated',
                         'Tarea creada',
                         f'La tarea {instance.title} ha sido creada.',
                         'from@example.com',
-                        [instance.user.email],
-                        fail_silently=False,
                     )
                 elif value == 'T':
-                    send_mail(
+                    notify(
+                        instance,
+                        'completed',
                         'Tarea terminada',
                         f'La tarea {instance.title} ha sido terminada.',
                         'from@example.com',
-                        [instance.user.email],
-                        fail_silently=False,
                     )
             elif field == 'user':
                 instance.phone_number = value
@@ -272,6 +536,7 @@ class HomeworkSerializer(serializers.ModelSerializer):
         return instance
 
     @staticmethod
+    @transaction.atomic
     def delete(instance):
         if instance.status is False:
             raise serializers.ValidationError(
@@ -279,11 +544,195 @@ class HomeworkSerializer(serializers.ModelSerializer):
         else:
             instance.status = False
             instance.save()
-            send_mail(
+            notify(
+                instance,
+                'deleted',
                 'Tarea eliminada',
                 f'La tarea {instance.title} ha sido eliminada.',
                 'from@example.com',
-                [instance.user.email],
-                fail_silently=False,
             )
-            return {'message': 'Tarea eliminada correctamente'}
\ No newline at end of file
+            return {'message': 'Tarea eliminada correctamente'}
+
+
+class HomeworkBulkItemSerializer(HomeworkSerializer):
+    """Valida una tarea del lote usando los usuarios ya cargados en ``context['users']``."""
+    user = serializers.IntegerField()
+
+    def validate_user(self, user_id):
+        user = self.context['users'].get(user_id)
+        if user is None:
+            raise serializers.ValidationError('El usuario ingresado no existe')
+        return user
+
+
+class HomeworkFilterSerializer(serializers.Serializer):
+    """Filtros de ``read-tarea/``: ``?user=``, ``?status=`` (repetible) y ``?time_from=/time_to=``.
+
+    Con ``?include_archived=1`` también se leen las tareas de ``HomeworkArchive``.
+    """
+    user = serializers.IntegerField(required=False)
+    status = serializers.MultipleChoiceField(choices=Homework.STATUS_CHOICES, required=False)
+    time_from = serializers.TimeField(required=False)
+    time_to = serializers.TimeField(required=False)
+    include_archived = serializers.BooleanField(required=False, default=False)
+
+    def to_internal_value(self, data):
+        if hasattr(data, 'getlist') and 'status' in data:
+            # Acepta tanto ?status=C&status=P como ?status=C,P
+            data = data.copy()
+            data.setlist('status', [value for item in data.getlist('status') for value in item.split(',') if value])
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        time_from, time_to = attrs.get('time_from'), attrs.get('time_to')
+        if time_from and time_to and time_from > time_to:
+            raise serializers.ValidationError('time_from no puede ser mayor que time_to.')
+        return attrs
+
+    def filter_queryset(self, queryset, default_status=None):
+        filters = self.validated_data
+        statuses = filters.get('status') or default_status
+        if statuses:
+            queryset = queryset.filter(status__in=sorted(statuses))
+        if 'user' in filters:
+            queryset = queryset.filter(user_id=filters['user'])
+        if 'time_from' in filters:
+            queryset = queryset.filter(time__gte=filters['time_from'])
+        if 'time_to' in filters:
+            queryset = queryset.filter(time__lte=filters['time_to'])
+        return queryset
+
+    def get_values(self, fields, default_status=None):
+        """``values(*fields)`` de las tareas filtradas, más las archivadas si se pidieron."""
+        homeworks = self.filter_queryset(Homework.objects.all(), default_status).values(*fields)
+        statuses = self.validated_data.get('status') or default_status
+        # En el archivo solo hay tareas terminadas
+        if not self.validated_data['include_archived'] or (statuses and 'T' not in statuses):
+            return homeworks
+        archived = self.filter_queryset(HomeworkArchive.objects.all(), default_status).values(*fields)
+        return CombinedQuerySet(homeworks, archived)
+
+
+class UserHomeworksSerializer(serializers.Serializer):
+    """``read-user-tareas/``: usuarios activos (``status=True``), cada uno con sus tareas abiertas (C/P) anidadas.
+
+    ``?tareas_limit=`` limita las tareas por usuario (``USER_TAREAS_LIMIT`` por
+    defecto, hasta ``USER_TAREAS_MAX_LIMIT``); ``tareas_count`` dice cuántas
+    tiene en total. Cada página cuesta dos consultas: los usuarios y sus tareas.
+    """
+    tareas_limit = serializers.IntegerField(required=False, min_value=1)
+
+    open_status = ['C', 'P']
+
+    # Columnas de la tarea que van en la respuesta (más ``user`` para el prefetch)
+    homework_fields = ('id', 'title', 'description', 'time', 'status', 'user')
+
+    @staticmethod
+    def validate_tareas_limit(value):
+        maximum = getattr(settings, 'USER_TAREAS_MAX_LIMIT', 100)
+        if value > maximum:
+            raise serializers.ValidationError(f'No puede ser mayor que {maximum}.')
+        return value
+
+    def get_queryset(self):
+        limit = self.validated_data.get('tareas_limit', getattr(settings, 'USER_TAREAS_LIMIT', 20))
+        # Las primeras ``limit`` tareas abiertas de cada usuario: subconsulta
+        # correlacionada sobre el índice (status, user).
+        first_ids = Homework.objects.filter(
+            user_id=OuterRef('user_id'), status__in=self.open_status).order_by('id').values('id')[:limit]
+        homeworks = Homework.objects.filter(
+            status__in=self.open_status, id__in=Subquery(first_ids)).only(*self.homework_fields).order_by('id')
+        return (
+            User.objects.filter(status=True)
+            .annotate(tareas_count=Count('homework', filter=Q(homework__status__in=self.open_status)))
+            .prefetch_related(Prefetch('homework_set', queryset=homeworks, to_attr='open_tareas'))
+        )
+
+    @staticmethod
+    def user_representation(user):
+        data = {field: getattr(user, field) for field in UserSerializer.values_fields}
+        data['tareas'] = [
+            {
+                'id': homework.id,
+                'title': homework.title,
+                'description': homework.description,
+                'time': homework.time,
+                'status': HOMEWORK_STATUS_LABELS.get(homework.status),
+            }
+            for homework in user.open_tareas
+        ]
+        data['tareas_count'] = user.tareas_count
+        return data
+
+
+class ChangesSerializer(serializers.Serializer):
+    """``changes/?since=<token>``: usuarios y tareas creados, modificados o eliminados desde ``token``.
+
+    El token guarda, por tabla, el último ``(updated_at, id)`` entregado; cada
+    consulta usa el índice ``(updated_at, id)`` y trae solo lo que cambió. Las
+    eliminaciones lógicas llegan como ids en ``deleted``.
+    """
+    since = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    @staticmethod
+    def validate_since(value):
+        try:
+            cursors = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+            return {
+                name: (datetime.datetime.fromisoformat(updated_at), int(pk))
+                for name, (updated_at, pk) in cursors.items() if name in ('users', 'tareas')
+            }
+        except (ValueError, TypeError, AttributeError):
+            raise serializers.ValidationError('Token de sincronización inválido.')
+
+    @staticmethod
+    def encode_token(cursors):
+        raw = json.dumps({name: [updated_at.isoformat(), pk] for name, (updated_at, pk) in cursors.items()})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def get_changes(self):
+        limit = min(self.validated_data.get('limit') or getattr(settings, 'SYNC_PAGE_SIZE', 500),
+                    getattr(settings, 'SYNC_MAX_PAGE_SIZE', 2000))
+        cursors = self.validated_data.get('since', {})
+        # Una escritura puede confirmarse con un updated_at anterior a filas ya
+        # visibles; el token no avanza más allá de este margen, así que esas filas
+        # se vuelven a enviar en la siguiente consulta en vez de perderse.
+        settled = timezone.now() - datetime.timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 2))
+
+        users, has_more_users, cursors['users'] = self.changed_rows(
+            User, UserSerializer.values_fields, cursors.get('users'), limit, settled)
+        homeworks, has_more_homeworks, cursors['tareas'] = self.changed_rows(
+            Homework, HomeworkSerializer.values_fields + ('updated_at',), cursors.get('tareas'), limit, settled)
+
+        return {
+            'users': [row for row in users if row['status']],
+            'tareas': [HomeworkSerializer.values_to_representation(row) for row in homeworks
+                       if row['status'] in HOMEWORK_STATUS_LABELS],
+            'deleted': {
+                'users': [row['id'] for row in users if not row['status']],
+                'tareas': [row['id'] for row in homeworks if row['status'] not in HOMEWORK_STATUS_LABELS],
+            },
+            'token': self.encode_token(cursors),
+            'has_more': has_more_users or has_more_homeworks,
+        }
+
+    @staticmethod
+    def changed_rows(model, fields, cursor, limit, settled):
+        queryset = model.objects.all()
+        if cursor:
+            updated_at, pk = cursor
+            queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+        rows = list(queryset.order_by('updated_at', 'id').values(*fields)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if not rows:
+            return rows, False, cursor or (settled, 0)
+        next_cursor = (rows[-1]['updated_at'], rows[-1]['id'])
+        if next_cursor[0] > settled:
+            # Las filas siguen ordenadas por updated_at: lo que falta tampoco se
+            # asentó, así que se entrega en la próxima consulta y no en otra página.
+            next_cursor = max(cursor or (settled, 0), (settled, 0))
+            has_more = False
+        return rows, has_more, next_cursor
@@ -1,17 +1,25 @@
 from django.urls import path
 from tareas.api.views import (
-    UserCreateAPIView, UserReadAPIView, UserUpdateAPIView, UserDestroyAPIView,
-    HomeworkCreateAPIView, HomeworkReadAPIView, HomeworkUpdateAPIView, HomeworkDestroyAPIView
+    UserCreateAPIView, UserBulkCreateAPIView, UserReadAPIView, UserHomeworkReadAPIView, UserUpdateAPIView,
+    UserDestroyAPIView,
+    HomeworkCreateAPIView, HomeworkBulkCreateAPIView, HomeworkReadAPIView, HomeworkExportAPIView,
+    HomeworkUpdateAPIView, HomeworkDestroyAPIView, ChangesAPIView
 )
 
 urlpatterns = [
     path('create-user/', UserCreateAPIView.as_view(), name='create-user'),
+    path('bulk-create-user/', UserBulkCreateAPIView.as_view(), name='bulk-create-user'),
     path('read-user/', UserReadAPIView.as_view(), name='read-user'),
+    path('read-user-tareas/', UserHomeworkReadAPIView.as_view(), name='read-user-tareas'),
     path('update-user/<int:pk>/', UserUpdateAPIView.as_view(), name='update-user'),
     path('delete-user/<int:pk>/', UserDestroyAPIView.as_view(), name='delete-user'),
 
     path('create-tarea/', HomeworkCreateAPIView.as_view(), name='create-tarea'),
+    path('bulk-create-tarea/', HomeworkBulkCreateAPIView.as_view(), name='bulk-create-tarea'),
     path('read-tarea/', HomeworkReadAPIView.as_view(), name='read-tarea'),
+    path('export-tarea/', HomeworkExportAPIView.as_view(), name='export-tarea'),
     path('update-tarea/<int:pk>/', HomeworkUpdateAPIView.as_view(), name='update-tarea'),
     path('delete-tarea/<int:pk>/', HomeworkDestroyAPIView.as_view(), name='delete-tarea'),
+
+    path('changes/', ChangesAPIView.as_view(), name='changes'),
 ]
\ No newline at end of file
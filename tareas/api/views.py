@@ -1,14 +1,21 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import generics, status
 from rest_framework.response import Response
+from tareas.metrics import track
 from tareas.models import User, Homework
-from tareas.api.serializer import UserSerializer, HomeworkSerializer
+from tareas.api.mixins import CachedListMixin, IdempotentCreateMixin
+from tareas.api.pagination import KeysetPagination
+from tareas.api.renderers import NDJSONRenderer, CSVRenderer
+from tareas.api.serializer import UserSerializer, HomeworkSerializer, HomeworkFilterSerializer, ChangesSerializer, \
+    UserHomeworksSerializer
 
 
-class UserCreateAPIView(generics.CreateAPIView):
+class UserCreateAPIView(IdempotentCreateMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
     queryset = User.objects.all()
 
-    def post(self, request, *args, **kwargs):
+    def create(self, request, *args, **kwargs):
         # POST method to create a new user
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -17,18 +24,50 @@ class UserCreateAPIView(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class UserReadAPIView(generics.ListAPIView):
+class UserBulkCreateAPIView(IdempotentCreateMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
+    queryset = User.objects.all()
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        response_data = serializer.bulk_create(request.data)
+        response_status = status.HTTP_201_CREATED if response_data['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(response_data, status=response_status)
+
+
+class UserReadAPIView(CachedListMixin, generics.ListAPIView):
+    serializer_class = UserSerializer
+    cache_name = 'read-user'
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return User.objects.filter(status=True)
 
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        if not queryset.exists():
+    def list(self, request, *args, **kwargs):
+        # Filas planas con values(): ya tienen la forma que produce UserSerializer
+        page = self.paginate_queryset(self.get_queryset().values(*UserSerializer.values_fields))
+        if not page and not self.paginator.cursor:
             return Response({'status': 'No se han agregado usuarios'})
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.get_paginated_response(page)
+
+
+class UserHomeworkReadAPIView(CachedListMixin, generics.ListAPIView):
+    serializer_class = UserHomeworksSerializer
+    cache_name = 'read-user-tareas'
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        filters = UserHomeworksSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filters.get_queryset()
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        if not page and not self.paginator.cursor:
+            return Response({'status': 'No se han agregado usuarios'})
+        with track('serialize'):
+            data = [UserHomeworksSerializer.user_representation(user) for user in page]
+        return self.get_paginated_response(data)
 
 
 class UserUpdateAPIView(generics.UpdateAPIView):
@@ -61,11 +100,11 @@ class UserDestroyAPIView(generics.DestroyAPIView):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class HomeworkCreateAPIView(generics.CreateAPIView):
+class HomeworkCreateAPIView(IdempotentCreateMixin, generics.CreateAPIView):
     serializer_class = HomeworkSerializer
     queryset = Homework.objects.all()
 
-    def post(self, request, *args, **kwargs):
+    def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
@@ -73,23 +112,63 @@ class HomeworkCreateAPIView(generics.CreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class HomeworkReadAPIView(generics.ListAPIView):
+class HomeworkBulkCreateAPIView(IdempotentCreateMixin, generics.CreateAPIView):
+    serializer_class = HomeworkSerializer
+    queryset = Homework.objects.all()
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        response_data = serializer.bulk_create(request.data)
+        response_status = status.HTTP_201_CREATED if response_data['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(response_data, status=response_status)
+
+
+class HomeworkReadAPIView(CachedListMixin, generics.ListAPIView):
     serializer_class = HomeworkSerializer
+    cache_name = 'read-tarea'
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return Homework.objects.filter(status='C' or 'P')
+        filters = HomeworkFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filters.get_values(HomeworkSerializer.values_fields, default_status=['C', 'P'])
 
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        if not queryset.exists():
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        if not page and not self.paginator.cursor:
             return Response({'status': 'No se han agregado usuarios'})
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        with track('serialize'):
+            data = [HomeworkSerializer.values_to_representation(row) for row in page]
+        return self.get_paginated_response(data)
+
+
+class HomeworkExportAPIView(generics.GenericAPIView):
+    serializer_class = HomeworkSerializer
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    def get_queryset(self):
+        filters = HomeworkFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        # Sin ?status= se exportan todos los estados válidos, no las eliminadas ('False')
+        statuses = [code for code, _ in Homework.STATUS_CHOICES]
+        return filters.get_values(HomeworkSerializer.values_fields, default_status=statuses).order_by('id')
+
+    def get(self, request, *args, **kwargs):
+        # Se lee y codifica fila por fila para que la memoria no crezca con la tabla
+        renderer = request.accepted_renderer
+        homeworks = self.get_queryset().iterator(
+            chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+        rows = (HomeworkSerializer.values_to_representation(homework) for homework in homeworks)
+        response = StreamingHttpResponse(
+            renderer.iter_render(rows), content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="tareas.{renderer.format}"'
+        return response
 
 
 class HomeworkUpdateAPIView(generics.UpdateAPIView):
     serializer_class = HomeworkSerializer
-    queryset = Homework.objects.all()
+    # El usuario hace falta para el correo y la respuesta
+    queryset = Homework.objects.select_related('user')
 
     def put(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -114,4 +193,14 @@ class HomeworkDestroyAPIView(generics.DestroyAPIView):
         instance = self.get_object()
         serializer = self.get_serializer()
         response_data = serializer.delete(instance)
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class ChangesAPIView(generics.GenericAPIView):
+    serializer_class = ChangesSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        with track('serialize'):
+            return Response(serializer.get_changes())
@@ -0,0 +1,86 @@
+"""Archivo de tareas terminadas.
+
+Las tareas terminadas (``'T'``) que no cambian hace ``ARCHIVE_AFTER_DAYS`` días
+se mueven de ``Homework`` a ``HomeworkArchive`` en lotes, cada uno en su propia
+transacción: la tabla viva solo guarda las tareas en uso y sus índices siguen
+cabiendo en memoria. ``?include_archived=1`` en ``read-tarea/`` y
+``export-tarea/`` vuelve a sumar las archivadas con ``CombinedQuerySet``.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tareas.cache import invalidate_lists
+from tareas.models import Homework, HomeworkArchive, Notification
+from tareas.signals import archiving
+
+ARCHIVE_FIELDS = ('id', 'title', 'description', 'user_id', 'time', 'status', 'updated_at')
+
+
+def archivable_homeworks(days=None):
+    days = getattr(settings, 'ARCHIVE_AFTER_DAYS', 30) if days is None else days
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    # Las que tienen un aviso pendiente esperan a que salga el resumen
+    return Homework.objects.filter(status='T', updated_at__lt=cutoff).exclude(
+        Exists(Notification.objects.filter(homework=OuterRef('pk'))))
+
+
+def archive_homeworks(days=None, batch_size=None):
+    """Mueve al archivo las tareas terminadas más viejas que ``days``.
+
+    Devuelve el número de tareas archivadas.
+    """
+    batch_size = batch_size or getattr(settings, 'ARCHIVE_BATCH_SIZE', 500)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            # Con BEGIN IMMEDIATE la transacción ya tiene el bloqueo de escritura
+            rows = list(archivable_homeworks(days).order_by('id').values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                return archived
+            now = timezone.now()
+            HomeworkArchive.objects.bulk_create(HomeworkArchive(**row, archived_at=now) for row in rows)
+            # La tarea no se eliminó: no debe salir como ``deleted`` en el feed SSE
+            with archiving():
+                Homework.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            invalidate_lists(Homework)
+        archived += len(rows)
+        if len(rows) < batch_size:
+            return archived
+
+
+class CombinedQuerySet:
+    """Varias consultas ``values()`` con las mismas columnas, leídas como una sola.
+
+    ``filter`` y ``order_by`` se aplican a cada parte, así el cursor de
+    ``KeysetPagination`` llega a los índices de cada tabla; el ``UNION ALL``
+    ordenado se arma recién al leer.
+    """
+
+    def __init__(self, *querysets, ordering=()):
+        self.querysets = querysets
+        self.ordering = ordering
+
+    def filter(self, *args, **kwargs):
+        return CombinedQuerySet(*(queryset.filter(*args, **kwargs) for queryset in self.querysets),
+                                ordering=self.ordering)
+
+    def order_by(self, *fields):
+        return CombinedQuerySet(*self.querysets, ordering=fields)
+
+    def union(self):
+        # SQLite no admite ORDER BY dentro de las partes de un UNION
+        first, *rest = (queryset.order_by() for queryset in self.querysets)
+        return first.union(*rest, all=True).order_by(*self.ordering)
+
+    def iterator(self, chunk_size=2000):
+        return self.union().iterator(chunk_size=chunk_size)
+
+    def __iter__(self):
+        return iter(self.union())
+
+    def __getitem__(self, key):
+        return self.union()[key]
@@ -0,0 +1,24 @@
+"""Backend SQLite de Django con la opción ``transaction_mode`` de Django 5.1.
+
+Con ``OPTIONS = {'transaction_mode': 'IMMEDIATE'}`` cada ``transaction.atomic``
+empieza con ``BEGIN IMMEDIATE`` y toma el bloqueo de escritura al entrar. Con
+el ``BEGIN`` diferido por defecto, una transacción que lee y después escribe
+(p. ej. buscar la tarea duplicada y luego insertarla) falla con "database is
+locked" sin esperar ``busy_timeout`` si otro worker escribió entre medio.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = None
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # sqlite3.connect() no conoce esta opción
+        self.transaction_mode = kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
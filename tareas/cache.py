@@ -0,0 +1,42 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Listados cuyo contenido depende de cada modelo
+LIST_DEPENDENCIES = {
+    'User': ('read-user', 'read-tarea', 'read-user-tareas'),
+    'Homework': ('read-tarea', 'read-user-tareas'),
+}
+
+
+def _version_key(name):
+    return f'tareas:list-version:{name}'
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_list_version(name):
+    version = cache.get(_version_key(name))
+    if version is None:
+        # Una versión nueva, no un contador: si se perdió (expulsión del caché,
+        # reinicio del backend) no se reutilizan versiones viejas.
+        cache.add(_version_key(name), _new_version(), timeout=None)
+        version = cache.get(_version_key(name))
+    return version
+
+
+def bump_list_versions(*names):
+    # ``cache.incr`` en FileBasedCache es leer y escribir: dos workers que
+    # incrementan a la vez escriben el mismo número y uno de los cambios queda
+    # sin invalidar. Escribir un valor nuevo sí es atómico (el archivo se
+    # reemplaza con un rename) y ninguna versión se repite.
+    cache.set_many({_version_key(name): _new_version() for name in names}, timeout=None)
+
+
+def invalidate_lists(model):
+    """Invalida los listados que dependen de ``model`` cuando la transacción se confirme."""
+    names = LIST_DEPENDENCIES.get(model.__name__, ())
+    transaction.on_commit(lambda: bump_list_versions(*names))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import connections
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Aplica ``pragmas`` sobre una conexión ``sqlite3`` sin pasar por el cursor de Django.
+
+    Así no cuentan como consultas de la petición que abrió la conexión.
+    """
+    for name, value in pragmas.items():
+        dbapi_connection.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    apply_sqlite_pragmas(connection.connection, getattr(settings, 'SQLITE_PRAGMAS', {}))
+
+
+def check_connection_health(**kwargs):
+    """Descarta al empezar cada petición las conexiones persistentes que ya no responden.
+
+    Django 3.2 no trae ``CONN_HEALTH_CHECKS`` (llegó en 4.1); se activa con la
+    misma llave en ``DATABASES``.
+    """
+    for connection in connections.all():
+        if not connection.settings_dict.get('CONN_HEALTH_CHECKS') or connection.connection is None:
+            continue
+        if connection.in_atomic_block or connection.is_usable():
+            continue
+        connection.close()
@@ -0,0 +1,147 @@
+"""Backend SMTP que reutiliza las conexiones entre envíos.
+
+El backend SMTP de Django abre una conexión (TCP, STARTTLS y login) por cada
+``send_mail`` y la cierra al terminar; el saludo cuesta mucho más que el
+mensaje. ``PooledSMTPEmailBackend`` devuelve la conexión a un pool del
+proceso al cerrar y la siguiente apertura la reutiliza:
+
+* las conexiones que pasan más de ``EMAIL_POOL_IDLE_TIMEOUT`` segundos sin
+  usarse se cierran en lugar de reutilizarse;
+* si una lleva más de ``EMAIL_POOL_NOOP_AFTER`` segundos quieta se comprueba
+  con ``NOOP`` antes de usarla;
+* si el servidor cerró una conexión reutilizada, el mensaje se reenvía una
+  vez por una conexión nueva;
+* se guardan a lo sumo ``EMAIL_POOL_SIZE`` conexiones por servidor.
+"""
+import os
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+
+
+def quit_quietly(connection):
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+
+class SMTPConnectionPool:
+    """Conexiones SMTP libres por servidor y usuario, con la hora de su último uso."""
+
+    def __init__(self):
+        self.idle = {}
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _check_fork(self):
+        # Un worker recién creado no debe usar los sockets heredados del maestro
+        if self.pid != os.getpid():
+            self.idle = {}
+            self.pid = os.getpid()
+
+    def acquire(self, key):
+        idle_timeout = getattr(settings, 'EMAIL_POOL_IDLE_TIMEOUT', 60)
+        noop_after = getattr(settings, 'EMAIL_POOL_NOOP_AFTER', 5)
+        while True:
+            with self._lock:
+                self._check_fork()
+                if not self.idle.get(key):
+                    return None
+                connection, last_used = self.idle[key].pop()
+            idle = time.monotonic() - last_used
+            if idle > idle_timeout:
+                quit_quietly(connection)
+                continue
+            if idle > noop_after:
+                try:
+                    alive = connection.noop()[0] == 250
+                except (smtplib.SMTPException, OSError):
+                    alive = False
+                if not alive:
+                    connection.close()
+                    continue
+            return connection
+
+    def release(self, key, connection):
+        # smtplib deja ``sock`` en None cuando el servidor cortó la conexión
+        if getattr(connection, 'sock', None) is None:
+            connection.close()
+            return
+        with self._lock:
+            self._check_fork()
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < getattr(settings, 'EMAIL_POOL_SIZE', 2):
+                idle.append((connection, time.monotonic()))
+                return
+        quit_quietly(connection)
+
+    def clear(self):
+        with self._lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection, _ in connections:
+                quit_quietly(connection)
+
+
+pool = SMTPConnectionPool()
+
+
+class PooledSMTPEmailBackend(EmailBackend):
+    """Como el backend SMTP de Django, pero ``close`` devuelve la conexión al pool.
+
+    Para enviar muchos correos por una misma sesión basta con abrir el backend
+    una vez (``with get_connection() as connection:``) o pasarle la lista a
+    ``send_messages``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reused = False
+
+    @property
+    def pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        self.connection = pool.acquire(self.pool_key)
+        self.reused = self.connection is not None
+        if self.reused:
+            return True
+        return super().open()
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        pool.release(self.pool_key, connection)
+
+    def discard(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            connection.close()
+
+    def _send(self, email_message):
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            try:
+                return super()._send(email_message)
+            except smtplib.SMTPServerDisconnected:
+                if not self.reused:
+                    raise
+                # El servidor cerró la conexión mientras estaba en el pool
+                self.discard()
+                super().open()
+                self.reused = False
+                return super()._send(email_message)
+        except (smtplib.SMTPException, OSError):
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
@@ -0,0 +1,98 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from tareas.metrics import track
+from tareas.models import OutboxEmail
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Guarda el correo en el outbox; se envía luego con ``send_outbox``.
+
+    Debe llamarse dentro de la misma transacción que el cambio que lo origina,
+    así el correo solo existe si el cambio se guardó.
+    """
+    return enqueue_mass_mail([(subject, message, from_email, recipient_list)])
+
+
+def enqueue_mass_mail(datatuple):
+    """Como ``enqueue_mail`` pero para varios correos en un solo INSERT."""
+    emails = [
+        OutboxEmail(subject=subject, body=message, from_email=from_email, recipient=recipient)
+        for subject, message, from_email, recipient_list in datatuple
+        for recipient in recipient_list if recipient
+    ]
+    with track('email'):
+        return OutboxEmail.objects.bulk_create(emails)
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+    cap = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_MAX_SECONDS', 3600)
+    return datetime.timedelta(seconds=min(cap, base * 2 ** (attempts - 1)))
+
+
+def deliver_outbox(batch_size=None, connection=None):
+    """Envía un lote de correos pendientes reutilizando una sola conexión.
+
+    Devuelve una tupla ``(enviados, fallidos)``.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    lease = datetime.timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_CLAIM_LEASE', 300))
+    now = timezone.now()
+
+    due = (
+        OutboxEmail.objects
+        .filter(status='P', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk')
+        .values('pk')[:batch_size]
+    )
+    claim = uuid.uuid4()
+    # Se reclaman con un solo UPDATE antes de enviar: otro ``send_outbox`` ya no
+    # los ve pendientes. Si este proceso muere, vuelven a tocar pasado ``lease``.
+    if not OutboxEmail.objects.filter(pk__in=due, status='P', next_attempt_at__lte=now).update(
+            claim=claim, next_attempt_at=now + lease):
+        return 0, 0
+    claimed = OutboxEmail.objects.filter(claim=claim)
+    batch = list(claimed.order_by('pk'))
+
+    connection = connection or get_connection(fail_silently=False)
+    sent, failed = [], []
+    connection.open()
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, [email.recipient], connection=connection)
+            try:
+                message.send()
+            except Exception as exc:
+                email.attempts += 1
+                email.last_error = repr(exc)
+                if email.attempts >= max_attempts:
+                    email.status = 'F'
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                failed.append(email)
+                # La conexión puede haber quedado inservible tras el error.
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass
+            else:
+                email.status = 'S'
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                sent.append(email)
+    finally:
+        connection.close()
+
+    # Solo los que siguen siendo de este lote: si el envío tardó más que
+    # ``lease`` otro proceso pudo haberlos reclamado.
+    claimed.bulk_update(sent, ['status', 'sent_at', 'attempts'])
+    claimed.bulk_update(failed, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+    return len(sent), len(failed)
@@ -0,0 +1,200 @@
+"""Eventos de cambios de tareas para el feed SSE (``tareas/sse.py``).
+
+Las señales de ``Homework`` generan un evento por cada cambio. Con
+``SSE_BROADCAST_BACKEND = 'database'`` (por defecto) el evento se guarda en
+``HomeworkEvent`` dentro de la misma transacción, y cada proceso ASGI lee la
+tabla cada ``SSE_POLL_INTERVAL`` segundos y lo reparte a sus conexiones: así
+llegan también los cambios hechos por los workers WSGI. Con ``'memory'`` el
+evento solo se reparte dentro del proceso que hizo el cambio.
+"""
+import asyncio
+import collections
+import datetime
+import itertools
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from tareas.models import Homework, HomeworkEvent
+
+Event = collections.namedtuple('Event', ['id', 'user_id', 'event', 'payload'])
+
+STATUS_CODES = dict(Homework.STATUS_CHOICES)
+
+
+def get_backend():
+    return getattr(settings, 'SSE_BROADCAST_BACKEND', 'database')
+
+
+def event_type(homework, created=False):
+    if created:
+        return 'created'
+    # La eliminación lógica deja un estado fuera de STATUS_CHOICES
+    return 'updated' if homework.status in STATUS_CODES else 'deleted'
+
+
+def render_payload(homework, event):
+    from tareas.api.renderers import JSONRenderer
+    from tareas.api.serializer import HomeworkSerializer
+
+    if event == 'deleted':
+        data = {'id': homework.pk, 'user': {'id': homework.user_id}}
+    else:
+        data = HomeworkSerializer(homework).data
+    return JSONRenderer().render(data).decode()
+
+
+def record_homework_events(changes):
+    """Registra los eventos de ``changes``, una lista de ``(tarea, evento)``.
+
+    Debe llamarse dentro de la transacción del cambio: el evento solo se
+    publica si el cambio se confirma.
+    """
+    if not changes or not getattr(settings, 'SSE_ENABLED', True):
+        return
+    events = [
+        HomeworkEvent(homework_id=homework.pk, user_id=homework.user_id, event=event,
+                      payload=render_payload(homework, event))
+        for homework, event in changes
+    ]
+    if get_backend() == 'database':
+        HomeworkEvent.objects.bulk_create(events)
+    else:
+        transaction.on_commit(lambda: broadcaster.publish(
+            [(event.user_id, event.event, event.payload) for event in events]))
+
+
+def fetch_events(after_id, user_id=None, limit=None):
+    queryset = HomeworkEvent.objects.filter(id__gt=after_id).order_by('id')
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    if limit is not None:
+        queryset = queryset[:limit]
+    return [Event(*row) for row in queryset.values_list('id', 'user_id', 'event', 'payload')]
+
+
+def latest_event_id():
+    return HomeworkEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def oldest_event_id():
+    return HomeworkEvent.objects.order_by('id').values_list('id', flat=True).first()
+
+
+def prune_events():
+    """Borra los eventos más viejos que ``SSE_EVENT_RETENTION``; devuelve cuántos.
+
+    Lo llaman ``send_outbox`` cada ``SSE_PRUNE_INTERVAL`` y ``manage.py
+    prune_events``, no el feed: la tabla crece con cada escritura aunque nadie
+    esté conectado.
+    """
+    retention = datetime.timedelta(seconds=getattr(settings, 'SSE_EVENT_RETENTION', 60 * 60 * 24))
+    deleted, _ = HomeworkEvent.objects.filter(created_at__lt=timezone.now() - retention).delete()
+    return deleted
+
+
+class Subscription:
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize)
+        # Se llenó la cola: el cliente es lento y se le cierra la conexión para
+        # que vuelva con Last-Event-ID.
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.user_id is None or self.user_id == event.user_id
+
+
+class Broadcaster:
+    """Reparte los eventos entre las conexiones SSE abiertas en este proceso.
+
+    Cada evento se codifica una sola vez y se comparte entre todas las
+    conexiones; cada una tiene su cola acotada en ``SSE_QUEUE_SIZE``.
+    """
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.loop = None
+        self.poller = None
+        # Id del último evento al arrancar el poller, que empieza a leer desde ahí
+        self.started = None
+        self.last_id = None
+        # Solo para el backend 'memory': ids y eventos recientes para Last-Event-ID
+        self.ids = itertools.count(1)
+        self.buffer = collections.deque(maxlen=getattr(settings, 'SSE_REPLAY_LIMIT', 1000))
+        self._lock = threading.Lock()
+
+    async def subscribe(self, user_id=None):
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, getattr(settings, 'SSE_QUEUE_SIZE', 100))
+        self.subscriptions.add(subscription)
+        if get_backend() == 'database':
+            if self.poller is None or self.poller.done():
+                # Un poller nuevo arranca en el último evento: lo escrito mientras no
+                # había nadie conectado no se reparte solo, se pide con Last-Event-ID.
+                self.started = asyncio.ensure_future(sync_to_async(latest_event_id)())
+                self.poller = asyncio.create_task(self.poll())
+            # El historial que lea la conexión después ya incluye ese punto de partida
+            await self.started
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def publish(self, changes):
+        """Publica ``(user_id, evento, payload)`` desde código síncrono (backend 'memory')."""
+        with self._lock:
+            events = [Event(next(self.ids), *change) for change in changes]
+            self.buffer.extend(events)
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.dispatch, events)
+
+    def dispatch(self, events):
+        for subscription in list(self.subscriptions):
+            for event in events:
+                if not subscription.wants(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+                    self.unsubscribe(subscription)
+                    break
+
+    async def replay(self, last_id, user_id=None):
+        """Eventos posteriores a ``last_id``; ``None`` si ya no se conservan todos."""
+        limit = getattr(settings, 'SSE_REPLAY_LIMIT', 1000)
+        if get_backend() == 'database':
+            oldest = await sync_to_async(oldest_event_id)()
+            if oldest is not None and oldest > last_id + 1:
+                return None
+            events = await sync_to_async(fetch_events)(last_id, user_id, limit + 1)
+        else:
+            with self._lock:
+                if self.buffer and self.buffer[0].id > last_id + 1:
+                    return None
+                events = [event for event in self.buffer if event.id > last_id
+                          and (user_id is None or event.user_id == user_id)]
+        if len(events) > limit:
+            return None
+        return events
+
+    async def poll(self):
+        interval = getattr(settings, 'SSE_POLL_INTERVAL', 0.5)
+        batch_size = getattr(settings, 'SSE_POLL_BATCH_SIZE', 500)
+        self.last_id = await self.started
+        events = []
+        while self.subscriptions:
+            # Con un lote lleno quedan más eventos pendientes: se leen sin esperar
+            if len(events) < batch_size:
+                await asyncio.sleep(interval)
+            events = await sync_to_async(fetch_events)(self.last_id, limit=batch_size)
+            if events:
+                self.last_id = events[-1].id
+                self.dispatch(events)
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from tareas.archive import archive_homeworks
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve a HomeworkArchive, en lotes, las tareas terminadas que no cambian '
+        'hace más de ARCHIVE_AFTER_DAYS días.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Antigüedad mínima en días (por defecto ARCHIVE_AFTER_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Tareas por transacción (por defecto ARCHIVE_BATCH_SIZE).')
+
+    def handle(self, *args, **options):
+        archived = archive_homeworks(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(f'Tareas archivadas: {archived}')
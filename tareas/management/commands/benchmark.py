@@ -0,0 +1,182 @@
+import datetime
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+    teardown_test_environment
+from django.urls import reverse
+from rest_framework import renderers
+from rest_framework.test import APIClient
+
+from tareas.api.renderers import JSONRenderer
+from tareas.api.serializer import UserSerializer, HomeworkSerializer
+from tareas.api.urls import urlpatterns
+from tareas.models import User, Homework, normalize_title
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide los endpoints de tareas/api/urls.py y los serializers sobre una base '
+        'SQLite temporal y compara el resultado con una línea base en JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Usuarios sembrados.')
+        parser.add_argument('--tareas', type=int, default=2000, help='Tareas sembradas.')
+        parser.add_argument('--iterations', type=int, default=200, help='Mediciones por caso.')
+        parser.add_argument('--warmup', type=int, default=10, help='Ejecuciones descartadas por caso.')
+        parser.add_argument('--only', nargs='*', help='Casos a medir (por defecto todos).')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Mide los listados con el caché de respuestas activo.')
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'benchmark_baseline.json'),
+                            help='Archivo JSON con la línea base.')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Guarda los resultados como nueva línea base.')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Regresión tolerada en p50 respecto a la línea base (0.25 = 25%%).')
+
+    def handle(self, *args, **options):
+        caches = settings.CACHES if options['with_cache'] else {
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # Sin límites de peticiones: el benchmark las repite a propósito. Sin
+            # margen en changes/: los datos recién sembrados se reenviarían completos.
+            with override_settings(CACHES=caches, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                                   RATE_LIMITS={}, SYNC_SETTLE_SECONDS=0):
+                results = self.run_cases(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(f'Línea base guardada en {baseline_path}')
+        elif baseline_path.exists():
+            self.compare(results, json.loads(baseline_path.read_text()), options['threshold'])
+
+    def seed(self, users, tareas):
+        User.objects.bulk_create(
+            User(name=f'Usuario {i}', last_name='Benchmark', email=f'usuario{i}@example.com',
+                 phone_number=f'310{i:07d}')
+            for i in range(users)
+        )
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        Homework.objects.bulk_create(
+            Homework(title=f'Tarea {i}', title_normalized=normalize_title(f'Tarea {i}'),
+                     description='Tarea de benchmark', time=datetime.time(6 + i % 12),
+                     status='CPT'[i % 3], user_id=user_ids[i % len(user_ids)])
+            for i in range(tareas)
+        )
+        return user_ids, list(Homework.objects.values_list('pk', flat=True))
+
+    def get_cases(self, user_ids, homework_ids):
+        client = APIClient()
+
+        def user_payload(i):
+            return {'name': 'Nuevo', 'last_name': 'Usuario', 'email': f'nuevo{i}@example.com',
+                    'phone_number': f'320{i:07d}', 'active': True}
+
+        def tarea_payload(i):
+            return {'title': f'Nueva {i}', 'description': 'x', 'time': '09:00:00', 'status': 'C',
+                    'user': user_ids[i % len(user_ids)]}
+
+        # Las instancias como las carga update-tarea, que responde con ``to_representation``;
+        # los listados usan ``values_to_representation`` sobre filas de ``values()``.
+        page = list(Homework.objects.select_related('user').order_by('id')[:50])
+        rows = list(Homework.objects.order_by('id').values(*HomeworkSerializer.values_fields)[:50])
+        payload = {'next': None, 'previous': None, 'results': HomeworkSerializer(page, many=True).data}
+        # Token de una sincronización completa: mide el costo de consultar sin cambios nuevos
+        sync_token = client.get(reverse('changes'), {'limit': 10 ** 6}).data['token']
+        return {
+            # Endpoints de tareas/api/urls.py
+            'create-user': lambda i: client.post(reverse('create-user'), user_payload(i), format='json'),
+            'bulk-create-user': lambda i: client.post(
+                reverse('bulk-create-user'), [user_payload(100000 + i * 1000 + j) for j in range(20)], format='json'),
+            'read-user': lambda i: client.get(reverse('read-user')),
+            'read-user-tareas': lambda i: client.get(reverse('read-user-tareas')),
+            'update-user': lambda i: client.patch(
+                reverse('update-user', args=[user_ids[i % len(user_ids)]]), {'last_name': 'Cambio'}, format='json'),
+            'delete-user': lambda i: client.delete(reverse('delete-user', args=[user_ids[i % len(user_ids)]])),
+            'create-tarea': lambda i: client.post(reverse('create-tarea'), tarea_payload(i), format='json'),
+            'bulk-create-tarea': lambda i: client.post(
+                reverse('bulk-create-tarea'), [tarea_payload(100000 + i * 1000 + j) for j in range(20)], format='json'),
+            'read-tarea': lambda i: client.get(reverse('read-tarea')),
+            'export-tarea': lambda i: b''.join(client.get(reverse('export-tarea')).streaming_content),
+            'update-tarea': lambda i: client.patch(
+                reverse('update-tarea', args=[homework_ids[i % len(homework_ids)]]), {'status': 'P'}, format='json'),
+            'delete-tarea': lambda i: client.delete(
+                reverse('delete-tarea', args=[homework_ids[i % len(homework_ids)]])),
+            'changes': lambda i: client.get(reverse('changes'), {'since': sync_token}),
+            # Serializers por separado
+            'UserSerializer.is_valid': lambda i: UserSerializer(data=user_payload(i)).is_valid(),
+            'HomeworkSerializer.to_representation': lambda i: HomeworkSerializer(page, many=True).data,
+            'HomeworkSerializer.values_to_representation': lambda i: [
+                HomeworkSerializer.values_to_representation(row) for row in rows],
+            'JSONRenderer (DRF)': lambda i: renderers.JSONRenderer().render(payload),
+            'JSONRenderer (tareas)': lambda i: JSONRenderer().render(payload),
+        }
+
+    def run_cases(self, options):
+        runs = options['iterations'] + options['warmup']
+        user_ids, homework_ids = self.seed(max(options['users'], runs), max(options['tareas'], runs))
+        cases = self.get_cases(user_ids, homework_ids)
+
+        missing = {pattern.name for pattern in urlpatterns} - set(cases)
+        if missing:
+            self.stderr.write(f'Endpoints sin caso de benchmark: {", ".join(sorted(missing))}')
+
+        results = {}
+        for name, case in cases.items():
+            if options['only'] and name not in options['only']:
+                continue
+            timings = []
+            for i in range(runs):
+                start = time.perf_counter()
+                response = case(i)
+                elapsed = time.perf_counter() - start
+                status_code = getattr(response, 'status_code', 200)
+                if status_code >= 400:
+                    raise CommandError(f'{name} respondió {status_code}: {getattr(response, "data", "")}')
+                if i >= options['warmup']:
+                    timings.append(elapsed)
+
+            quantiles = statistics.quantiles(timings, n=100)
+            results[name] = {
+                'ops_per_sec': len(timings) / sum(timings),
+                'p50_ms': quantiles[49] * 1000,
+                'p95_ms': quantiles[94] * 1000,
+                'p99_ms': quantiles[98] * 1000,
+            }
+        return results
+
+    def report(self, results):
+        self.stdout.write(f'{"caso":<46}{"ops/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<46}{result["ops_per_sec"]:>10.1f}{result["p50_ms"]:>10.2f}'
+                f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+            )
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            ratio = result['p50_ms'] / baseline[name]['p50_ms'] - 1
+            if ratio > threshold:
+                regressions.append(f'{name}: p50 {baseline[name]["p50_ms"]:.2f} ms -> '
+                                   f'{result["p50_ms"]:.2f} ms (+{ratio:.0%})')
+        if regressions:
+            raise CommandError('Regresiones respecto a la línea base:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la línea base.'))
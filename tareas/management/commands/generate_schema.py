@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from config.schema import generate_schema, SCHEMA_CONTENT_TYPES
+
+
+class Command(BaseCommand):
+    help = 'Genera el esquema OpenAPI (JSON y YAML) para servirlo como archivo estático.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=str(settings.OPENAPI_SCHEMA_DIR),
+                            help='Directorio de salida (por defecto OPENAPI_SCHEMA_DIR).')
+
+    def handle(self, *args, **options):
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for format in SCHEMA_CONTENT_TYPES:
+            path = output_dir / f'swagger{format}'
+            path.write_bytes(generate_schema(format))
+            self.stdout.write(f'Esquema escrito en {path}')
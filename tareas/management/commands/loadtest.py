@@ -0,0 +1,367 @@
+import datetime
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from tareas.api.urls import urlpatterns
+
+# Se ejecuta con los settings de la prueba: migra la base temporal y la siembra.
+PREPARE = '''
+import json, sys
+import django
+django.setup()
+from django.core.management import call_command
+from tareas.management.commands.benchmark import Command as Benchmark
+call_command('migrate', verbosity=0, interactive=False)
+user_ids, homework_ids = Benchmark().seed(int(sys.argv[1]), int(sys.argv[2]))
+print(json.dumps({'users': user_ids, 'tareas': homework_ids}))
+'''
+
+DEFAULT_MIX = {
+    'read-tarea': 30,
+    'read-user': 10,
+    'read-user-tareas': 5,
+    'create-tarea': 10,
+    'update-tarea': 10,
+    'create-user': 5,
+    'update-user': 5,
+    'changes': 5,
+    'delete-tarea': 2,
+    'delete-user': 2,
+    'bulk-create-tarea': 1,
+    'bulk-create-user': 1,
+    'export-tarea': 1,
+}
+
+# Rutas con <pk>: se guarda el prefijo y se le agrega el id en cada petición
+PK_ROUTES = {'update-user', 'delete-user', 'update-tarea', 'delete-tarea'}
+
+
+def parse_mix(value):
+    """``'read-tarea=5,create-tarea=1'`` -> ``{'read-tarea': 5, 'create-tarea': 1}``."""
+    routes = {pattern.name for pattern in urlpatterns}
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.strip().partition('=')
+        if name not in routes:
+            raise CommandError(f'Ruta desconocida en --mix: {name} (disponibles: {", ".join(sorted(routes))})')
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise CommandError(f'Peso inválido para {name}: {weight}')
+    return mix
+
+
+def route_paths():
+    paths = {}
+    for pattern in urlpatterns:
+        if pattern.name in PK_ROUTES:
+            paths[pattern.name] = reverse(pattern.name, args=[0])[:-len('0/')]
+        else:
+            paths[pattern.name] = reverse(pattern.name)
+    return paths
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Client:
+    """Un cliente de la prueba: elige rutas según el mix y arma cuerpos válidos."""
+
+    def __init__(self, index, plan):
+        self.index = index
+        self.plan = plan
+        self.paths = plan['paths']
+        self.random = random.Random(index)
+        self.counter = 0
+        # Cada cliente elimina solo sus propios usuarios y tareas, para no chocar con otro
+        self.deletable_users = plan['deletable_users'][index::plan['clients']]
+        self.deletable_tareas = plan['deletable_tareas'][index::plan['clients']]
+        self.connection = None
+
+    def unique(self):
+        self.counter += 1
+        return f'{self.index:03d}{self.counter:06d}'
+
+    def user_payload(self):
+        unique = self.unique()
+        return {'name': 'Carga', 'last_name': 'Prueba', 'email': f'carga{unique}@example.com',
+                'phone_number': f'3{unique}', 'active': True}
+
+    def tarea_payload(self):
+        return {'title': f'Carga {self.unique()}', 'description': 'x', 'time': '09:00:00', 'status': 'C',
+                'user': self.random.choice(self.plan['users'])}
+
+    def build(self, route):
+        """Devuelve ``(método, ruta, cuerpo)`` o ``None`` si el cliente ya no tiene qué eliminar."""
+        path = self.paths[route]
+        if route == 'create-user':
+            return 'POST', path, self.user_payload()
+        if route == 'bulk-create-user':
+            return 'POST', path, [self.user_payload() for _ in range(20)]
+        if route == 'update-user':
+            return 'PATCH', f'{path}{self.random.choice(self.plan["users"])}/', {'last_name': 'Cambio'}
+        if route == 'delete-user':
+            return ('DELETE', f'{path}{self.deletable_users.pop()}/', None) if self.deletable_users else None
+        if route == 'create-tarea':
+            return 'POST', path, self.tarea_payload()
+        if route == 'bulk-create-tarea':
+            return 'POST', path, [self.tarea_payload() for _ in range(20)]
+        if route == 'update-tarea':
+            status = self.random.choice('CPT')
+            return 'PATCH', f'{path}{self.random.choice(self.plan["tareas"])}/', {'status': status}
+        if route == 'delete-tarea':
+            return ('DELETE', f'{path}{self.deletable_tareas.pop()}/', None) if self.deletable_tareas else None
+        return 'GET', path, None
+
+    def request(self, method, path, body):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.plan['port'], timeout=60)
+        headers = {}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            # Conexión cerrada por el servidor (p. ej. al reciclar un worker): se reabre
+            self.connection.close()
+            self.connection = None
+            return 0
+
+    def run(self):
+        routes, weights = zip(*self.plan['mix'].items())
+        stats = {}
+        while time.time() < self.plan['start_at']:
+            time.sleep(0.01)
+        while time.time() < self.plan['deadline']:
+            route = self.random.choices(routes, weights)[0]
+            request = self.build(route)
+            if request is None:
+                continue
+            start = time.perf_counter()
+            status = self.request(*request)
+            elapsed = time.perf_counter() - start
+            route_stats = stats.setdefault(route, {'latencies': [], 'statuses': {}})
+            route_stats['latencies'].append(elapsed)
+            route_stats['statuses'][status] = route_stats['statuses'].get(status, 0) + 1
+        return stats
+
+
+def run_client(index, plan, results):
+    results.put(Client(index, plan).run())
+
+
+def percentile(values, n):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[n - 1]
+
+
+def summarize(client_stats, duration):
+    """Junta lo medido por todos los clientes: rendimiento, errores y percentiles por ruta."""
+    merged = {}
+    for stats in client_stats:
+        for route, route_stats in stats.items():
+            target = merged.setdefault(route, {'latencies': [], 'statuses': {}})
+            target['latencies'].extend(route_stats['latencies'])
+            for status, count in route_stats['statuses'].items():
+                target['statuses'][status] = target['statuses'].get(status, 0) + count
+
+    def describe(latencies, statuses):
+        requests = len(latencies)
+        errors = sum(count for status, count in statuses.items() if not 200 <= status < 400)
+        return {
+            'requests': requests,
+            'throughput': requests / duration,
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        }
+
+    routes = {route: describe(stats['latencies'], stats['statuses']) for route, stats in sorted(merged.items())}
+    total_statuses = {}
+    for stats in merged.values():
+        for status, count in stats['statuses'].items():
+            total_statuses[status] = total_statuses.get(status, 0) + count
+    total = describe([latency for stats in merged.values() for latency in stats['latencies']], total_statuses)
+    return {'total': total, 'routes': routes}
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga de punta a punta: arranca config.wsgi con gunicorn sobre una base SQLite '
+        'temporal, le envía una mezcla de las rutas de tareas/api/urls.py desde varios procesos '
+        'y reporta rendimiento, errores y percentiles por ruta y por número de workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                            help='Números de workers de gunicorn a probar.')
+        parser.add_argument('--worker-class', default=None,
+                            help='Clase de worker de gunicorn (por defecto la de gunicorn.conf.py).')
+        parser.add_argument('--clients', type=int, default=8, help='Procesos cliente concurrentes.')
+        parser.add_argument('--duration', type=float, default=10.0, help='Segundos de carga por número de workers.')
+        parser.add_argument('--mix', default=None,
+                            help='Pesos por ruta, p. ej. "read-tarea=5,create-tarea=1" (por defecto uno de '
+                                 'lectura intensiva con todas las rutas).')
+        parser.add_argument('--users', type=int, default=500, help='Usuarios sembrados.')
+        parser.add_argument('--tareas', type=int, default=5000, help='Tareas sembradas.')
+        parser.add_argument('--output', default=str(Path(settings.BASE_DIR) / 'loadtest-results.json'),
+                            help='Archivo JSON donde se guardan los resultados.')
+        parser.add_argument('--compare', default=None,
+                            help='Resultados JSON de una corrida anterior para comparar.')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix']) if options['mix'] else DEFAULT_MIX
+        results = {
+            'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'options': {
+                'clients': options['clients'], 'duration': options['duration'], 'mix': mix,
+                'users': options['users'], 'tareas': options['tareas'],
+                'worker_class': options['worker_class'], 'cpu_count': os.cpu_count(),
+            },
+            'runs': {},
+        }
+
+        with tempfile.TemporaryDirectory(prefix='loadtest-') as directory:
+            template = Path(directory) / 'seed.sqlite3'
+            seeded = self.prepare(template, options['users'], options['tareas'])
+            for workers in options['workers']:
+                database = Path(directory) / f'workers-{workers}.sqlite3'
+                shutil.copy(template, database)
+                self.stdout.write(f'Probando con {workers} worker(s) durante {options["duration"]} s...')
+                run = self.run_load(database, workers, seeded, mix, options)
+                results['runs'][str(workers)] = run
+                self.report(workers, run)
+
+        output = Path(options['output'])
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f'Resultados guardados en {output}')
+        if options['compare']:
+            self.compare(results, json.loads(Path(options['compare']).read_text()))
+
+    def environment(self, database):
+        return dict(os.environ, DJANGO_SETTINGS_MODULE='config.settings_loadtest', LOADTEST_DATABASE=str(database))
+
+    def prepare(self, database, users, tareas):
+        result = subprocess.run(
+            [sys.executable, '-c', PREPARE, str(users), str(tareas)],
+            cwd=settings.BASE_DIR, env=self.environment(database), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f'No se pudo preparar la base de la prueba:\n{result.stderr[-2000:]}')
+        seeded = json.loads(result.stdout.splitlines()[-1])
+        # La mitad de los registros solo se elimina; la otra mitad se lee y se edita
+        half_users, half_tareas = len(seeded['users']) // 2, len(seeded['tareas']) // 2
+        return {
+            'users': seeded['users'][:half_users], 'deletable_users': seeded['users'][half_users:],
+            'tareas': seeded['tareas'][:half_tareas], 'deletable_tareas': seeded['tareas'][half_tareas:],
+        }
+
+    def start_server(self, database, workers, port, worker_class):
+        command = [sys.executable, '-m', 'gunicorn', 'config.wsgi', '-c', 'gunicorn.conf.py',
+                   '--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+        if worker_class:
+            command += ['--worker-class', worker_class]
+        log = open(Path(database).with_suffix('.log'), 'w')
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=self.environment(database),
+                                  stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+
+        path = reverse('read-user')
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn terminó al arrancar:\n{self.log_tail(database)}')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', path)
+                if connection.getresponse().status == 200:
+                    connection.close()
+                    return server
+                connection.close()
+            except OSError:
+                pass
+            time.sleep(0.1)
+        self.stop_server(server)
+        raise CommandError(f'gunicorn no respondió a tiempo:\n{self.log_tail(database)}')
+
+    def stop_server(self, server):
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    def log_tail(self, database):
+        return Path(database).with_suffix('.log').read_text()[-2000:]
+
+    def run_load(self, database, workers, seeded, mix, options):
+        port = free_port()
+        server = self.start_server(database, workers, port, options['worker_class'])
+        try:
+            start_at = time.time() + 0.5
+            plan = {**seeded, 'port': port, 'paths': route_paths(), 'mix': mix, 'clients': options['clients'],
+                    'start_at': start_at, 'deadline': start_at + options['duration']}
+            queue = multiprocessing.Queue()
+            clients = [multiprocessing.Process(target=run_client, args=(index, plan, queue))
+                       for index in range(options['clients'])]
+            for client in clients:
+                client.start()
+            client_stats = [queue.get() for _ in clients]
+            for client in clients:
+                client.join()
+        finally:
+            self.stop_server(server)
+        return summarize(client_stats, options['duration'])
+
+    def report(self, workers, run):
+        self.stdout.write(f'{"ruta":<22}{"req/s":>10}{"errores":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for name, result in [*run['routes'].items(), ('total', run['total'])]:
+            self.stdout.write(
+                f'{name:<22}{result["throughput"]:>10.1f}{result["error_rate"]:>10.1%}'
+                f'{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+            )
+        self.stdout.write('')
+
+    def compare(self, results, previous):
+        self.stdout.write(f'Comparación con la corrida del {previous["started_at"]}:')
+        for workers, run in results['runs'].items():
+            before = previous['runs'].get(workers)
+            if before is None:
+                continue
+            for name in ['total', *run['routes']]:
+                now = run['total'] if name == 'total' else run['routes'][name]
+                then = before['total'] if name == 'total' else before['routes'].get(name)
+                if not then or not then['throughput']:
+                    continue
+                self.stdout.write(
+                    f'  {workers} worker(s) {name:<20} req/s {then["throughput"]:>8.1f} -> {now["throughput"]:>8.1f} '
+                    f'({now["throughput"] / then["throughput"] - 1:+.0%}), '
+                    f'p95 {then["p95_ms"]:.1f} -> {now["p95_ms"]:.1f} ms'
+                )
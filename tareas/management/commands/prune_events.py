@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from tareas.events import prune_events
+
+
+class Command(BaseCommand):
+    help = 'Borra los eventos del feed SSE (HomeworkEvent) más antiguos que SSE_EVENT_RETENTION.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Eventos borrados: {prune_events()}')
@@ -0,0 +1,16 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tareas.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Borra las llaves de idempotencia más antiguas que IDEMPOTENCY_KEY_TTL.'
+
+    def handle(self, *args, **options):
+        ttl = datetime.timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 60 * 60 * 24))
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - ttl).delete()
+        self.stdout.write(f'Llaves borradas: {deleted}')
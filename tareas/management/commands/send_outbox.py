@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tareas.email_utils import deliver_outbox
+from tareas.events import prune_events
+from tareas.notifications import flush_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Encola los resúmenes de avisos cuya ventana terminó y envía los correos '
+        'pendientes del outbox en lotes, con reintentos. Cada SSE_PRUNE_INTERVAL '
+        'borra además los eventos vencidos del feed SSE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Correos por lote (por defecto EMAIL_OUTBOX_BATCH_SIZE).')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Segundos de espera cuando el outbox está vacío.')
+        parser.add_argument('--once', action='store_true',
+                            help='Vacía los correos pendientes una vez y termina.')
+
+    def handle(self, *args, **options):
+        prune_every = getattr(settings, 'SSE_PRUNE_INTERVAL', 60 * 60)
+        last_prune = None
+        while True:
+            if last_prune is None or time.monotonic() - last_prune > prune_every:
+                last_prune = time.monotonic()
+                pruned = prune_events()
+                if pruned:
+                    self.stdout.write(f'Eventos SSE borrados: {pruned}')
+
+            digests = flush_notifications(batch_size=options['batch_size'])
+            if digests:
+                self.stdout.write(f'Resúmenes encolados: {digests}')
+
+            try:
+                sent, failed = deliver_outbox(batch_size=options['batch_size'])
+            except Exception as exc:
+                # No se pudo abrir la conexión SMTP; se reintenta en el siguiente ciclo.
+                self.stderr.write(f'Error conectando al servidor de correo: {exc!r}')
+                sent, failed = 0, 0
+                if options['once']:
+                    raise
+
+            if sent or failed:
+                self.stdout.write(f'Enviados: {sent}, fallidos: {failed}')
+            elif options['once'] and not digests:
+                return
+            else:
+                time.sleep(options['interval'])
@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Se ejecuta en un intérprete nuevo: dentro de manage.py Django ya está cargado.
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+phases = {'settings': time.perf_counter() - start}
+mark = time.perf_counter()
+django.setup(set_prefix=False)
+phases['django.setup'] = time.perf_counter() - mark
+mark = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+phases['middleware'] = time.perf_counter() - mark
+mark = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases['urls'] = time.perf_counter() - mark
+phases['total'] = time.perf_counter() - start
+loaded = [name for name, module in sys.modules.items() if module is not None]
+print(json.dumps({'phases': phases, 'loaded': loaded}))
+'''
+
+
+def parse_importtime(output):
+    """Lee la salida de ``-X importtime``; devuelve ``{módulo: (propio_us, acumulado_us)}``."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def profile_startup(settings_module):
+    """Arranca Django en un proceso aparte con ``-X importtime`` y devuelve sus tiempos."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise CommandError(f'No se pudo arrancar Django con {settings_module}:\n{result.stderr[-2000:]}')
+
+    probe = json.loads(result.stdout.splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+    packages = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return {
+        'settings_module': settings_module,
+        'phases': probe['phases'],
+        'modules': len(probe['loaded']),
+        'loaded': probe['loaded'],
+        'packages': packages,
+        'slowest_modules': {name: times[1] for name, times in modules.items()},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el arranque de Django en un proceso nuevo: tiempo de cada fase '
+        '(settings, django.setup, middleware, URLs) e importación agrupada por paquete.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settings-module', default=os.environ.get('DJANGO_SETTINGS_MODULE'),
+                            help='Settings a medir (por defecto DJANGO_SETTINGS_MODULE).')
+        parser.add_argument('--limit', type=int, default=15, help='Paquetes y módulos a mostrar.')
+        parser.add_argument('--runs', type=int, default=1, help='Arranques a medir; se informa el más rápido.')
+        parser.add_argument('--budget', type=float, default=None,
+                            help='Falla si el arranque total supera estos segundos.')
+        parser.add_argument('--json', action='store_true', help='Imprime el resultado en JSON.')
+
+    def handle(self, *args, **options):
+        runs = [profile_startup(options['settings_module']) for _ in range(max(1, options['runs']))]
+        result = min(runs, key=lambda run: run['phases']['total'])
+        limit = options['limit']
+        del result['loaded']
+        result['packages'] = dict(sorted(result['packages'].items(), key=lambda item: -item[1])[:limit])
+        result['slowest_modules'] = dict(
+            sorted(result['slowest_modules'].items(), key=lambda item: -item[1])[:limit])
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+        else:
+            self.report(result)
+
+        total = result['phases']['total']
+        if options['budget'] is not None and total > options['budget']:
+            raise CommandError(f'El arranque tardó {total:.3f} s, más que el presupuesto de {options["budget"]:.3f} s')
+
+    def report(self, result):
+        self.stdout.write(f'Settings: {result["settings_module"]} ({result["modules"]} módulos importados)')
+        for phase, elapsed in result['phases'].items():
+            self.stdout.write(f'  {phase:<20}{elapsed * 1000:>10.1f} ms')
+
+        self.stdout.write('\nImportación por paquete (tiempo propio):')
+        for package, self_us in result['packages'].items():
+            self.stdout.write(f'  {package:<40}{self_us / 1000:>10.1f} ms')
+
+        self.stdout.write('\nMódulos más lentos (acumulado):')
+        for name, cumulative_us in result['slowest_modules'].items():
+            self.stdout.write(f'  {name:<40}{cumulative_us / 1000:>10.1f} ms')
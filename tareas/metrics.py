@@ -0,0 +1,158 @@
+import bisect
+import contextvars
+import hmac
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar('tareas_request_stats', default=None)
+
+
+class RequestStats:
+    """Tiempos de una petición: consultas, tiempo en la base de datos y secciones medidas con ``track``."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def server_timing(self, total):
+        parts = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        parts.extend(f'{name};dur={elapsed * 1000:.2f}' for name, elapsed in self.timings.items())
+        parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def track(name):
+    """Suma el tiempo del bloque a la sección ``name`` de la petición en curso, si la hay."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.timings[name] = stats.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+
+class MetricsRegistry:
+    """Histogramas y contadores por ruta, en memoria del proceso.
+
+    Con varios workers cada uno lleva sus propios valores; se distinguen por
+    la etiqueta ``pid``.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.db_latency = {}
+        self.requests = {}
+        self.queries = {}
+
+    def observe(self, route, method, status_code, total, stats):
+        key = (route, method)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram(self.buckets)
+                self.db_latency[key] = Histogram(self.buckets)
+                self.queries[key] = 0
+            self.latency[key].observe(total)
+            self.db_latency[key].observe(stats.db_time)
+            self.queries[key] += stats.queries
+            counter = (route, method, str(status_code))
+            self.requests[counter] = self.requests.get(counter, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.latency.clear()
+            self.db_latency.clear()
+            self.requests.clear()
+            self.queries.clear()
+
+    def render(self, pid):
+        lines = []
+        with self._lock:
+            lines.append('# HELP tareas_requests_total Peticiones atendidas.')
+            lines.append('# TYPE tareas_requests_total counter')
+            for (route, method, status_code), value in sorted(self.requests.items()):
+                lines.append(f'tareas_requests_total{{pid="{pid}",route="{route}",method="{method}",'
+                             f'status="{status_code}"}} {value}')
+
+            lines.append('# HELP tareas_db_queries_total Consultas a la base de datos.')
+            lines.append('# TYPE tareas_db_queries_total counter')
+            for (route, method), value in sorted(self.queries.items()):
+                lines.append(f'tareas_db_queries_total{{pid="{pid}",route="{route}",method="{method}"}} {value}')
+
+            for name, description, histograms in (
+                    ('tareas_request_duration_seconds', 'Duración de la petición.', self.latency),
+                    ('tareas_db_duration_seconds', 'Tiempo en la base de datos por petición.', self.db_latency)):
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for (route, method), histogram in sorted(histograms.items()):
+                    labels = f'pid="{pid}",route="{route}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(getattr(settings, 'METRICS_LATENCY_BUCKETS', None))
+
+
+def can_read_metrics(request):
+    """Con ``METRICS_TOKEN`` se exige ``Authorization: Bearer <token>``; sin él, solo las IPs de ``METRICS_ALLOWED_IPS``."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode())
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+
+
+def metrics_view(request):
+    if not can_read_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(os.getpid()), content_type='text/plain; version=0.0.4; charset=utf-8')
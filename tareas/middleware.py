@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.http import JsonResponse
+
+from tareas import metrics
+
+
+class PerformanceMiddleware:
+    """Mide cada petición y la expone en ``Server-Timing`` y en ``/metrics/``.
+
+    Registra el número de consultas y el tiempo en la base de datos mediante
+    ``connection.execute_wrapper``, más las secciones medidas con
+    ``tareas.metrics.track`` (serialización, correo).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(stats.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = stats.server_timing(total)
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        metrics.registry.observe(route, request.method, response.status_code, total, stats)
+        return response
+
+
+class AdmissionControlMiddleware:
+    """Rechaza con 429 las peticiones que superan los límites en vez de encolarlas.
+
+    * Escrituras simultáneas por proceso: ``ADMISSION_MAX_CONCURRENT_WRITES``
+      peticiones POST/PUT/PATCH/DELETE a la vez; SQLite solo admite un escritor.
+    * Token buckets por ruta (nombre en ``tareas/api/urls.py``) definidos en
+      ``RATE_LIMITS``: uno por cliente y otro para la ruta completa. Se guardan
+      en el caché de Django, compartido por todos los workers.
+    """
+    WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        max_writes = getattr(settings, 'ADMISSION_MAX_CONCURRENT_WRITES', None)
+        self.write_slots = threading.BoundedSemaphore(max_writes) if max_writes else None
+
+    def __call__(self, request):
+        request.admission_slot = False
+        try:
+            return self.get_response(request)
+        finally:
+            if request.admission_slot:
+                self.write_slots.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = request.resolver_match.url_name
+        limits = getattr(settings, 'RATE_LIMITS', {}).get(route)
+        if limits:
+            retry_after = self.consume(limits, route, self.get_client_id(request))
+            if retry_after:
+                return self.too_many_requests(retry_after)
+
+        if self.write_slots is not None and request.method in self.WRITE_METHODS:
+            if not self.write_slots.acquire(blocking=False):
+                return self.too_many_requests(1)
+            request.admission_slot = True
+        return None
+
+    @staticmethod
+    def get_client_id(request):
+        header = getattr(settings, 'RATE_LIMIT_CLIENT_IP_HEADER', None)
+        if header and request.META.get(header):
+            # El proxy agrega la IP real del cliente al final de la lista.
+            return request.META[header].split(',')[-1].strip()
+        return request.META.get('REMOTE_ADDR', '')
+
+    def consume(self, limits, route, client_id):
+        """Toma un token de cada bucket; devuelve los segundos a esperar si alguno está vacío."""
+        cache = caches[getattr(settings, 'RATE_LIMIT_CACHE', 'default')]
+        buckets = []
+        if 'route' in limits:
+            buckets.append((f'tareas:ratelimit:{route}', limits['route']))
+        if 'client' in limits:
+            buckets.append((f'tareas:ratelimit:{route}:{client_id}', limits['client']))
+
+        for key, (rate, burst) in buckets:
+            retry_after = self.take_token(cache, key, rate, burst)
+            if retry_after:
+                return retry_after
+        return 0
+
+    @staticmethod
+    def take_token(cache, key, rate, burst):
+        # Token bucket expresado como GCRA: basta guardar un solo número por
+        # bucket, el instante en que volvería a estar lleno. La lectura y la
+        # escritura no son atómicas entre workers; en el peor caso se deja
+        # pasar alguna petición de más, nunca se bloquea de más.
+        now = time.time()
+        interval = 1 / rate
+        tolerance = interval * burst
+        full_at = max(cache.get(key) or now, now) + interval
+        wait = full_at - tolerance - now
+        if wait > 0:
+            return wait
+        cache.set(key, full_at, math.ceil(tolerance) + 1)
+        return 0
+
+    @staticmethod
+    def too_many_requests(retry_after):
+        response = JsonResponse({'detail': 'Demasiadas peticiones, intente de nuevo más tarde.'}, status=429)
+        response['Retry-After'] = str(math.ceil(retry_after))
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.18 on 2026-10-18 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0010_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['status', 'user'], name='tareas_home_status_d1a9b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['user', 'time'], name='tareas_home_user_id_ba94ca_idx'),
+        ),
+    ]
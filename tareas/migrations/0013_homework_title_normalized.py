@@ -0,0 +1,37 @@
+# Generated by Django 3.2.18 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+def backfill_title_normalized(apps, schema_editor):
+    # Los modelos históricos no tienen el ``save`` de ``Homework``; se replica
+    # ``tareas.models.normalize_title`` para que la migración no dependa de él.
+    Homework = apps.get_model('tareas', 'Homework')
+    batch = []
+    for homework in Homework.objects.only('pk', 'title').iterator(chunk_size=2000):
+        homework.title_normalized = ' '.join(str(homework.title or '').split()).casefold()
+        batch.append(homework)
+        if len(batch) >= 2000:
+            Homework.objects.bulk_update(batch, ['title_normalized'])
+            batch = []
+    Homework.objects.bulk_update(batch, ['title_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0012_user_unique_contact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homework',
+            name='title_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(backfill_title_normalized, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['title_normalized', 'status'], name='tareas_home_title_n_9ca32e_idx'),
+        ),
+    ]
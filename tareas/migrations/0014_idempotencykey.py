@@ -0,0 +1,33 @@
+# Generated by Django 3.2.18 on 2026-10-18 16:59
+
+from django.db import migrations, models
+import django.utils.timezone
+import rest_framework.utils.encoders
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0013_homework_title_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('route', models.CharField(max_length=50)),
+                ('request_hash', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('P', 'En proceso'), ('D', 'Completada')], default='P', max_length=1)),
+                ('response_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('response_body', models.JSONField(blank=True, encoder=rest_framework.utils.encoders.JSONEncoder, null=True)),
+                ('response_headers', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('key', 'route'), name='tareas_idempotencykey_unique'),
+        ),
+    ]
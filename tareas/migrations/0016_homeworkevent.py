@@ -0,0 +1,25 @@
+# Generated by Django 3.2.18 on 2026-10-18 17:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeworkEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('homework_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField()),
+                ('event', models.CharField(choices=[('created', 'Creada'), ('updated', 'Actualizada'), ('deleted', 'Eliminada')], max_length=10)),
+                ('payload', models.TextField()),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
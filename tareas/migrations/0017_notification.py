@@ -0,0 +1,38 @@
+# Generated by Django 3.2.18 on 2026-10-18 17:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0016_homeworkevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=150)),
+                ('name', models.CharField(blank=True, default='', max_length=100)),
+                ('title', models.CharField(blank=True, default='', max_length=150)),
+                ('event', models.CharField(choices=[('created', 'Nueva tarea asignada'), ('updated', 'Actualizada'), ('completed', 'Terminada'), ('deleted', 'Eliminada')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('digest', models.UUIDField(blank=True, editable=False, null=True)),
+                ('homework', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='tareas.homework')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'homework', 'digest'], name='tareas_noti_recipie_79dc24_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['digest', 'created_at'], name='tareas_noti_digest_3e5eec_idx'),
+        ),
+    ]
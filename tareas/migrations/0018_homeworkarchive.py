@@ -0,0 +1,32 @@
+# Generated by Django 3.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0017_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeworkArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(blank=True, max_length=150, null=True)),
+                ('description', models.TextField(blank=True, max_length=500, null=True)),
+                ('time', models.TimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('C', 'Creado'), ('P', 'En proceso'), ('T', 'Terminado')], default='T', max_length=15)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_homeworks', to='tareas.user')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='homeworkarchive',
+            index=models.Index(fields=['user', 'time'], name='tareas_home_user_id_55ebe7_idx'),
+        ),
+    ]
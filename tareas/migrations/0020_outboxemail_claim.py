@@ -0,0 +1,18 @@
+# Generated by Django 3.2.18 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0019_idempotencykey_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='claim',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
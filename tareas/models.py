@@ -1,4 +1,6 @@
 from django.db import models
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
 
 
 class User(models.Model):
@@ -8,10 +10,39 @@ class User(models.Model):
     phone_number = models.CharField(max_length=12, blank=True, null=True)
     status = models.BooleanField(default=True)
     active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['email'], condition=~models.Q(email=''), name='tareas_user_email_unique'),
+            models.UniqueConstraint(
+                fields=['phone_number'], condition=~models.Q(phone_number=''), name='tareas_user_phone_number_unique'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        kwargs['update_fields'] = with_updated_at(kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+
+
+def with_updated_at(update_fields):
+    """Agrega ``updated_at`` a ``update_fields``: ``auto_now`` no se guarda si no está en la lista."""
+    if not update_fields:
+        # None guarda todo; una lista vacía es un save() que no hace nada
+        return update_fields
+    return {*update_fields, 'updated_at'}
+
+
+def normalize_title(title):
+    """Forma del título con la que se detectan tareas duplicadas: sin espacios de más y sin mayúsculas."""
+    return ' '.join(str(title or '').split()).casefold()
+
 
 class Homework(models.Model):
     STATUS_CHOICES = (
@@ -21,13 +52,168 @@ class Homework(models.Model):
     )
 
     title = models.CharField(max_length=150, blank=True, null=True)
+    title_normalized = models.CharField(max_length=150, blank=True, default='', editable=False)
     description = models.TextField(max_length=500, blank=True, null=True)
     user = models.ForeignKey(User, on_delete=models.PROTECT)
     time = models.TimeField(blank=True, null=True)
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='C')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'user']),
+            models.Index(fields=['user', 'time']),
+            models.Index(fields=['title_normalized', 'status']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.title_normalized = normalize_title(self.title)
+        update_fields = with_updated_at(kwargs.get('update_fields'))
+        if update_fields is not None and 'title' in update_fields:
+            update_fields.add('title_normalized')
+        kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def get_status_display(self):
-        return dict(self.STATUS_CHOICES).get(self.status)
\ No newline at end of file
+        return dict(self.STATUS_CHOICES).get(self.status)
+
+
+class HomeworkArchive(models.Model):
+    """Tarea terminada que ``archive_tareas`` sacó de ``Homework``.
+
+    Conserva el ``id`` original, así los listados con ``?include_archived=1``
+    y los clientes siguen viendo la misma tarea.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=150, blank=True, null=True)
+    description = models.TextField(max_length=500, blank=True, null=True)
+    user = models.ForeignKey(User, on_delete=models.PROTECT, related_name='archived_homeworks')
+    time = models.TimeField(blank=True, null=True)
+    status = models.CharField(max_length=15, choices=Homework.STATUS_CHOICES, default='T')
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'time']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class OutboxEmail(models.Model):
+    STATUS_CHOICES = (
+        ('P', 'Pendiente'),
+        ('S', 'Enviado'),
+        ('F', 'Fallido'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=150)
+    recipient = models.EmailField(max_length=150)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='P')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    # Lote de ``deliver_outbox`` que tomó el correo para enviarlo
+    claim = models.UUIDField(blank=True, null=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
+
+
+class Notification(models.Model):
+    """Aviso pendiente de enviar en el resumen por correo de ``recipient``.
+
+    Los cambios repetidos sobre una misma tarea se acumulan en una sola fila
+    (``count``) hasta que ``flush_notifications`` la reclama con ``digest``.
+    """
+    EVENT_CHOICES = (
+        ('created', 'Nueva tarea asignada'),
+        ('updated', 'Actualizada'),
+        ('completed', 'Terminada'),
+        ('deleted', 'Eliminada'),
+    )
+
+    recipient = models.EmailField(max_length=150)
+    name = models.CharField(max_length=100, blank=True, default='')
+    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, related_name='notifications')
+    title = models.CharField(max_length=150, blank=True, default='')
+    event = models.CharField(max_length=10, choices=EVENT_CHOICES)
+    count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    digest = models.UUIDField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'homework', 'digest']),
+            models.Index(fields=['digest', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.get_event_display()}: {self.title} -> {self.recipient}'
+
+
+class IdempotencyKey(models.Model):
+    """Primera respuesta de un POST enviado con la cabecera ``Idempotency-Key``."""
+    STATUS_CHOICES = (
+        ('P', 'En proceso'),
+        ('D', 'Completada'),
+    )
+
+    key = models.CharField(max_length=255)
+    route = models.CharField(max_length=50)
+    request_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='P')
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    # Mismo encoder que el renderer JSON de DRF, así la respuesta repetida es igual a la original
+    response_body = models.JSONField(blank=True, null=True, encoder=JSONEncoder)
+    response_headers = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # Inicio de la petición que tiene la llave en proceso; pasado IDEMPOTENCY_CLAIM_LEASE
+    # otra puede tomarla (el worker que la tenía murió)
+    claimed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'route'], name='tareas_idempotencykey_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.route}: {self.key}'
+
+
+class HomeworkEvent(models.Model):
+    """Cambio de una tarea para el feed SSE; el ``id`` es el ``Last-Event-ID`` del cliente.
+
+    Sin llaves foráneas: el evento debe sobrevivir aunque la tarea se borre.
+    """
+    EVENT_CHOICES = (
+        ('created', 'Creada'),
+        ('updated', 'Actualizada'),
+        ('deleted', 'Eliminada'),
+    )
+
+    homework_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    event = models.CharField(max_length=10, choices=EVENT_CHOICES)
+    # JSON ya codificado: se envía tal cual a todas las conexiones
+    payload = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f'{self.event} {self.homework_id}'
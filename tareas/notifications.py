@@ -0,0 +1,145 @@
+"""Avisos por correo de los cambios en tareas.
+
+Con ``NOTIFICATION_MODE = 'digest'`` (por defecto) cada cambio se guarda como
+``Notification``: los cambios repetidos sobre la misma tarea se fusionan en
+una fila y ``send_outbox`` encola un solo correo por usuario cuando pasan
+``NOTIFICATION_DIGEST_WINDOW`` segundos desde su primer aviso pendiente. Con
+``'immediate'`` cada cambio encola su propio correo en el outbox.
+"""
+import datetime
+import functools
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.template import Context, Engine
+from django.utils import timezone
+
+from tareas.email_utils import enqueue_mail, enqueue_mass_mail
+from tareas.metrics import track
+from tareas.models import Notification
+
+# Un aviso de tarea nueva o eliminada no se pisa con los cambios que le siguen
+STICKY_EVENTS = ('created', 'deleted')
+
+TEMPLATES = {
+    'digest_subject': (
+        '{% if notifications|length == 1 %}Cambios en tu tarea {{ notifications.0.title }}'
+        '{% else %}Cambios en {{ notifications|length }} de tus tareas{% endif %}'
+    ),
+    'digest_body': (
+        'Hola {{ name }},\n'
+        'Estos son los cambios en tus tareas:\n'
+        '{% for notification in notifications %}'
+        '- {{ notification.title }}: {{ notification.get_event_display|lower }}'
+        '{% if notification.count > 1 %} ({{ notification.count }} cambios){% endif %}\n'
+        '{% endfor %}'
+        'Gracias,\n'
+        'El equipo de Tareas'
+    ),
+}
+
+
+def digest_enabled():
+    return getattr(settings, 'NOTIFICATION_MODE', 'digest') == 'digest'
+
+
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    # Motor propio: no depende de TEMPLATES, vacío en config.settings_api
+    return Engine(autoescape=False).from_string(TEMPLATES[name])
+
+
+def compile_templates():
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def notify(homework, event, subject, message, from_email):
+    """Avisa a ``homework.user`` del cambio ``event`` en la tarea.
+
+    En modo inmediato encola ``subject`` y ``message`` tal cual; en modo
+    resumen solo registra el aviso. Debe llamarse dentro de la transacción
+    del cambio.
+    """
+    if not digest_enabled():
+        return enqueue_mail(subject, message, from_email, [homework.user.email])
+    record_notifications([(homework, event)])
+
+
+def merge_event(current, new):
+    if new == 'deleted' or current not in STICKY_EVENTS:
+        return new
+    return current
+
+
+def record_notifications(changes):
+    """Registra los avisos de ``changes``, una lista de ``(tarea, evento)``."""
+    now = timezone.now()
+    new = []
+    with track('email'):
+        for homework, event in changes:
+            user = homework.user
+            if not user.email:
+                continue
+            if event != 'created':
+                # Fusionar con el aviso pendiente de la misma tarea, si lo hay
+                merged = Notification.objects.filter(
+                    recipient=user.email, homework=homework, digest__isnull=True,
+                ).update(
+                    title=homework.title or '', count=F('count') + 1, updated_at=now,
+                    event=Value(event) if event == 'deleted' else Case(
+                        When(event__in=STICKY_EVENTS, then=F('event')), default=Value(event)),
+                )
+                if merged:
+                    continue
+            new.append(Notification(
+                recipient=user.email, name=user.name or '', homework=homework,
+                title=homework.title or '', event=event, created_at=now))
+        Notification.objects.bulk_create(new)
+
+
+def render_digest(recipient, notifications):
+    context = Context({'name': notifications[-1].name, 'notifications': notifications})
+    subject = ' '.join(get_template('digest_subject').render(context).split())
+    return subject, get_template('digest_body').render(context), settings.EMAIL_HOST_USER, [recipient]
+
+
+def flush_notifications(batch_size=None):
+    """Encola en el outbox un resumen por cada usuario cuya ventana ya terminó.
+
+    Devuelve el número de resúmenes encolados.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    window = datetime.timedelta(seconds=getattr(settings, 'NOTIFICATION_DIGEST_WINDOW', 300))
+    due = (
+        Notification.objects
+        .filter(digest__isnull=True, created_at__lte=timezone.now() - window)
+        .order_by().values('recipient').distinct()[:batch_size]
+    )
+    digest = uuid.uuid4()
+    with transaction.atomic():
+        # Se reclaman con un solo UPDATE: un cambio que llegue mientras tanto ya
+        # no se fusiona con estas filas y queda para el siguiente resumen.
+        if not Notification.objects.filter(digest__isnull=True, recipient__in=due).update(digest=digest):
+            return 0
+
+        pending = {}
+        for notification in Notification.objects.filter(digest=digest).order_by('created_at', 'pk'):
+            by_homework = pending.setdefault(notification.recipient, {})
+            previous = by_homework.get(notification.homework_id)
+            if previous is None:
+                by_homework[notification.homework_id] = notification
+                continue
+            # Dos filas de la misma tarea (escrituras concurrentes): se unen aquí
+            previous.event = merge_event(previous.event, notification.event)
+            previous.count += notification.count
+            previous.title = notification.title
+
+        enqueue_mass_mail(
+            render_digest(recipient, list(by_homework.values()))
+            for recipient, by_homework in pending.items()
+        )
+        Notification.objects.filter(digest=digest).delete()
+    return len(pending)
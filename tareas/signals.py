@@ -0,0 +1,51 @@
+import contextlib
+import contextvars
+
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tareas.cache import invalidate_lists
+from tareas.db import check_connection_health, configure_sqlite_connection
+from tareas.events import event_type, record_homework_events
+from tareas.models import User, Homework
+
+_archiving = contextvars.ContextVar('tareas_archiving', default=False)
+
+
+@contextlib.contextmanager
+def archiving():
+    """Las tareas que se borran dentro del bloque pasan al archivo, no se eliminan.
+
+    No salen como ``deleted`` en el feed SSE y el listado lo invalida una sola
+    vez quien archiva, no cada fila.
+    """
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Homework)
+def invalidate_list_cache(sender, **kwargs):
+    if not _archiving.get():
+        invalidate_lists(sender)
+
+
+@receiver(post_save, sender=Homework)
+def publish_homework_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_homework_events([(instance, event_type(instance, created))])
+
+
+@receiver(post_delete, sender=Homework)
+def publish_homework_deleted(sender, instance, **kwargs):
+    if not _archiving.get():
+        record_homework_events([(instance, 'deleted')])
+
+
+connection_created.connect(configure_sqlite_connection, dispatch_uid='tareas_sqlite_pragmas')
+request_started.connect(check_connection_health, dispatch_uid='tareas_connection_health')
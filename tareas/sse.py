@@ -0,0 +1,124 @@
+"""Feed de cambios de tareas por Server-Sent Events.
+
+Es una aplicación ASGI mínima que ``config/asgi.py`` monta en ``SSE_PATH``
+por fuera de Django: cada conexión abierta solo ocupa una corrutina y una
+cola, sin hilo ni conexión a la base de datos propios.
+
+    GET /user/stream-tarea/?user=<id>
+    Last-Event-ID: <último id recibido>   (o ?last_event_id=)
+
+Cada mensaje trae ``id``, ``event`` (created, updated, deleted) y en ``data``
+la tarea serializada igual que en la API. Si ya no se conservan los eventos
+desde ``Last-Event-ID`` se envía ``event: reset`` y el cliente debe
+resincronizar con ``changes/``.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+from tareas.events import broadcaster
+
+
+def format_event(event):
+    return f'id: {event.id}\nevent: {event.event}\ndata: {event.payload}\n\n'.encode()
+
+
+async def send_response(send, status, body, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+
+def parse_id(value):
+    if value is None or value == '':
+        return None
+    value = int(value)
+    if value < 0:
+        raise ValueError(value)
+    return value
+
+
+async def homework_stream(scope, receive, send):
+    if scope['method'] != 'GET':
+        return await send_response(send, 405, {'error': 'Método no permitido'}, [(b'allow', b'GET')])
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    headers = dict(scope.get('headers', []))
+    try:
+        user_id = parse_id(query.get('user', [None])[0])
+    except ValueError:
+        return await send_response(send, 400, {'user': ['Debe ser el id de un usuario']})
+    try:
+        last_id = parse_id(headers.get(b'last-event-id', b'').decode() or query.get('last_event_id', [None])[0])
+    except ValueError:
+        return await send_response(send, 400, {'last_event_id': ['Debe ser un número entero']})
+
+    if len(broadcaster.subscriptions) >= getattr(settings, 'SSE_MAX_CONNECTIONS', 1000):
+        retry_after = str(getattr(settings, 'SSE_RETRY_MS', 3000) // 1000 or 1).encode()
+        return await send_response(send, 503, {'error': 'Demasiadas conexiones abiertas, intenta más tarde'},
+                                   [(b'retry-after', retry_after)])
+
+    # Suscribirse antes de leer el historial: lo que llegue mientras tanto queda
+    # en la cola y los repetidos se descartan por id.
+    subscription = await broadcaster.subscribe(user_id)
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'more_body': True,
+                    'body': f'retry: {getattr(settings, "SSE_RETRY_MS", 3000)}\n\n'.encode()})
+
+        sent_id = last_id or 0
+        if last_id is not None:
+            events = await broadcaster.replay(last_id, user_id)
+            if events is None:
+                await send({'type': 'http.response.body', 'more_body': True,
+                            'body': b'event: reset\ndata: {}\n\n'})
+            else:
+                for event in events:
+                    await send({'type': 'http.response.body', 'body': format_event(event), 'more_body': True})
+                    sent_id = event.id
+
+        await stream(subscription, sent_id, receive, send)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def stream(subscription, sent_id, receive, send):
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+
+    async def wait_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(wait_disconnect())
+    try:
+        while not subscription.overflowed or not subscription.queue.empty():
+            get = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({get, disconnected}, timeout=heartbeat,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if get not in done:
+                get.cancel()
+                if disconnected in done:
+                    return
+                await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+                continue
+            event = get.result()
+            if event.id > sent_id:
+                await send({'type': 'http.response.body', 'body': format_event(event), 'more_body': True})
+                sent_id = event.id
+        # Cliente demasiado lento: se cierra y vuelve a conectarse con Last-Event-ID
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
@@ -0,0 +1,1981 @@
+import asyncio
+import base64
+import contextlib
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import runpy
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import renderers
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from asgiref.sync import sync_to_async
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from tareas.api.pagination import KeysetPagination
+from tareas.api.renderers import JSONRenderer
+from tareas.api.serializer import UserSerializer, HomeworkSerializer, unique_violation_message
+from tareas.api.urls import urlpatterns
+from tareas.api.views import HomeworkReadAPIView
+from config.asgi import application as asgi_application
+from config.schema import generate_schema, load_schema
+from tareas import events, metrics, sse
+from tareas.archive import archive_homeworks
+from tareas.cache import bump_list_versions, get_list_version
+from tareas.email_backends import PooledSMTPEmailBackend, pool as smtp_pool
+from tareas.middleware import AdmissionControlMiddleware
+from tareas.email_utils import deliver_outbox
+from tareas.management.commands.loadtest import parse_mix, summarize
+from tareas.management.commands.startup_profile import parse_importtime, profile_startup
+from tareas.notifications import flush_notifications
+from tareas.models import User, Homework, HomeworkArchive, HomeworkEvent, Notification, OutboxEmail, IdempotencyKey
+
+
+def make_user(**kwargs):
+    data = {
+        'name': 'Ana',
+        'last_name': 'Garcia',
+        'email': 'ana@example.com',
+        'phone_number': '3001234567',
+    }
+    data.update(kwargs)
+    return User.objects.create(**data)
+
+
+def make_homework(user, **kwargs):
+    data = {
+        'title': 'Preparar informe',
+        'description': 'Informe semanal',
+        'time': datetime.time(9, 30),
+        'status': 'C',
+        'user': user,
+    }
+    data.update(kwargs)
+    return Homework.objects.create(**data)
+
+
+class TareasTestCase(APITestCase):
+    def setUp(self):
+        # Los datos cambian en cada test sin que se confirme ninguna transacción,
+        # así que los listados en caché no se invalidarían solos.
+        cache.clear()
+
+
+class FailingEmailBackend:
+    """Backend que falla siempre, para probar los reintentos del outbox."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP no disponible')
+
+
+class OutboxTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    @override_settings(NOTIFICATION_MODE='immediate')
+    def test_create_tarea_enqueues_email_without_sending(self):
+        response = self.client.post(reverse('create-tarea'), {
+            'title': 'Nueva', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk,
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipient, 'ana@example.com')
+        self.assertEqual(email.subject, 'Nueva tarea asignada')
+
+    @override_settings(NOTIFICATION_MODE='immediate')
+    def test_delete_tarea_enqueues_email(self):
+        homework = make_homework(self.user)
+
+        response = self.client.delete(reverse('delete-tarea', args=[homework.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OutboxEmail.objects.get().subject, 'Tarea eliminada')
+
+    def test_send_outbox_drains_pending_emails(self):
+        for i in range(3):
+            OutboxEmail.objects.create(
+                subject=f'Asunto {i}', body='Hola', from_email='from@example.com', recipient='ana@example.com')
+
+        call_command('send_outbox', '--once', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboxEmail.objects.filter(status='P').exists())
+        self.assertTrue(all(email.sent_at for email in OutboxEmail.objects.all()))
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_delivery_backs_off_and_gives_up(self):
+        email = OutboxEmail.objects.create(
+            subject='Asunto', body='Hola', from_email='from@example.com', recipient='ana@example.com')
+
+        self.assertEqual(deliver_outbox(connection=FailingEmailBackend()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'P')
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP no disponible', email.last_error)
+        # Aún no toca reintentar.
+        self.assertEqual(deliver_outbox(connection=FailingEmailBackend()), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=email.created_at)
+        self.assertEqual(deliver_outbox(connection=FailingEmailBackend()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'F')
+
+    @override_settings(SSE_EVENT_RETENTION=0)
+    def test_events_are_pruned_without_stream_clients(self):
+        make_homework(self.user)
+        call_command('send_outbox', '--once', stdout=StringIO())
+        self.assertEqual(HomeworkEvent.objects.count(), 0)
+
+        make_homework(self.user, title='Otra')
+        out = StringIO()
+        call_command('prune_events', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Eventos borrados: 1')
+
+    def test_emails_being_sent_are_not_picked_up_twice(self):
+        for i in range(2):
+            OutboxEmail.objects.create(
+                subject=f'Asunto {i}', body='Hola', from_email='from@example.com', recipient='ana@example.com')
+        concurrent = []
+
+        def send_messages(messages):
+            # Otro ``send_outbox`` corre mientras este lote se está enviando
+            if not concurrent:
+                concurrent.append(deliver_outbox())
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            self.assertEqual(deliver_outbox(), (2, 0))
+        self.assertEqual(concurrent, [(0, 0)])
+
+    def test_abandoned_claim_is_sent_after_lease(self):
+        email = OutboxEmail.objects.create(
+            subject='Asunto', body='Hola', from_email='from@example.com', recipient='ana@example.com')
+        # Un proceso lo reclamó y murió antes de enviarlo
+        OutboxEmail.objects.update(claim=uuid.uuid4(), next_attempt_at=timezone.now() + datetime.timedelta(minutes=5))
+        self.assertEqual(deliver_outbox(), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=email.created_at)
+        self.assertEqual(deliver_outbox(), (1, 0))
+        self.assertEqual(OutboxEmail.objects.get().status, 'S')
+
+
+class NotificationDigestTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.homeworks = [make_homework(self.user, title=f'Tarea {i}') for i in range(3)]
+
+    def patch(self, homework, **data):
+        response = self.client.patch(reverse('update-tarea', args=[homework.pk]), data)
+        self.assertEqual(response.status_code, 200)
+
+    def test_repeated_changes_merge_into_one_digest(self):
+        for title in ('Uno', 'Dos', 'Tres'):
+            self.patch(self.homeworks[0], title=title)
+        self.patch(self.homeworks[1], status='T')
+        self.client.delete(reverse('delete-tarea', args=[self.homeworks[2].pk]))
+        self.client.post(reverse('create-tarea'), {
+            'title': 'Nueva', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk})
+        new = Homework.objects.get(title='Nueva')
+        self.patch(new, description='Otra')
+
+        self.assertEqual(Notification.objects.count(), 4)
+        self.assertFalse(OutboxEmail.objects.exists())
+        # La ventana todavía no terminó
+        self.assertEqual(flush_notifications(), 0)
+
+        with override_settings(NOTIFICATION_DIGEST_WINDOW=0):
+            self.assertEqual(flush_notifications(), 1)
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipient, 'ana@example.com')
+        self.assertEqual(email.subject, 'Cambios en 4 de tus tareas')
+        self.assertEqual(email.body, (
+            'Hola Ana,\n'
+            'Estos son los cambios en tus tareas:\n'
+            '- Tres: actualizada (3 cambios)\n'
+            '- Tarea 1: terminada\n'
+            '- Tarea 2: eliminada\n'
+            '- Nueva: nueva tarea asignada (2 cambios)\n'
+            'Gracias,\n'
+            'El equipo de Tareas'
+        ))
+        self.assertFalse(Notification.objects.exists())
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+    def test_changes_after_the_flush_go_to_the_next_digest(self):
+        self.patch(self.homeworks[0], title='Uno')
+        flush_notifications()
+        self.patch(self.homeworks[0], title='Dos')
+
+        self.assertEqual(Notification.objects.get().count, 1)
+        flush_notifications()
+        self.assertEqual(
+            list(OutboxEmail.objects.order_by('pk').values_list('subject', flat=True)),
+            ['Cambios en tu tarea Uno', 'Cambios en tu tarea Dos'])
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+    def test_send_outbox_sends_the_digest(self):
+        other = make_user(name='Luis', email='luis@example.com', phone_number='3007654321')
+        self.patch(self.homeworks[0], status='P')
+        self.patch(self.homeworks[1], user=other.pk)
+
+        call_command('send_outbox', '--once', stdout=StringIO())
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['ana@example.com', 'luis@example.com'])
+        self.assertFalse(Notification.objects.exists())
+
+    @override_settings(NOTIFICATION_MODE='immediate')
+    def test_immediate_mode_sends_one_email_per_change(self):
+        self.patch(self.homeworks[0], title='Uno')
+        self.patch(self.homeworks[0], title='Dos')
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(
+            list(OutboxEmail.objects.order_by('pk').values_list('subject', flat=True)),
+            ["La tarea 'Uno' ha sido actualizada", "La tarea 'Dos' ha sido actualizada"])
+
+
+class SMTPStandInHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: acepta todo y cuenta conexiones, logins y mensajes."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.append(self.connection)
+        self.reply('220 stand-in ESMTP')
+        for raw in self.rfile:
+            command = raw.decode().strip().upper()
+            if command.startswith('EHLO'):
+                self.wfile.write(b'250-stand-in\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n')
+            elif command.startswith('AUTH'):
+                server.logins += 1
+                self.reply('235 Authentication successful')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                for data in self.rfile:
+                    if data == b'.\r\n':
+                        break
+                    lines.append(data)
+                server.messages.append(b''.join(lines))
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                server.noops += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPStandInHandler)
+        self.lock = threading.Lock()
+        self.connections = self.logins = self.noops = 0
+        self.messages = []
+        self.sockets = []
+
+    def drop_connections(self):
+        """Corta las conexiones abiertas, como un servidor que cierra las inactivas."""
+        with self.lock:
+            sockets, self.sockets = self.sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class PooledSMTPBackendTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = SMTPStandIn()
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(smtp_pool.clear)
+        smtp_pool.clear()
+        settings_override = override_settings(
+            EMAIL_BACKEND='tareas.email_backends.PooledSMTPEmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.server_address[1], EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='tareas', EMAIL_HOST_PASSWORD='secreto', EMAIL_TIMEOUT=5)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def send(self, count=1, **kwargs):
+        return mail.get_connection(**kwargs).send_messages([
+            mail.EmailMessage(f'Asunto {i}', 'Hola', 'from@example.com', ['ana@example.com'])
+            for i in range(count)
+        ])
+
+    def test_one_session_for_many_messages(self):
+        self.assertEqual(self.send(20), 20)
+
+        self.assertEqual(len(self.server.messages), 20)
+        self.assertEqual((self.server.connections, self.server.logins), (1, 1))
+
+    def test_connection_is_reused_across_sends(self):
+        for _ in range(5):
+            mail.send_mail('Asunto', 'Hola', 'from@example.com', ['ana@example.com'])
+        with mail.get_connection() as connection:
+            for _ in range(3):
+                mail.EmailMessage('Asunto', 'Hola', 'from@example.com', ['ana@example.com'],
+                                  connection=connection).send()
+
+        self.assertEqual(len(self.server.messages), 8)
+        self.assertEqual((self.server.connections, self.server.logins), (1, 1))
+
+    def test_deliver_outbox_uses_the_pool(self):
+        for i in range(3):
+            OutboxEmail.objects.create(
+                subject=f'Asunto {i}', body='Hola', from_email='from@example.com', recipient='ana@example.com')
+
+        self.assertEqual(deliver_outbox(), (3, 0))
+        OutboxEmail.objects.create(subject='Otro', body='Hola', from_email='from@example.com',
+                                   recipient='ana@example.com')
+        self.assertEqual(deliver_outbox(), (1, 0))
+        self.assertEqual(self.server.connections, 1)
+
+    @override_settings(EMAIL_POOL_IDLE_TIMEOUT=0)
+    def test_idle_connections_are_not_reused(self):
+        self.send()
+        self.send()
+
+        self.assertEqual(self.server.connections, 2)
+
+    @override_settings(EMAIL_POOL_NOOP_AFTER=0)
+    def test_noop_detects_a_dropped_connection(self):
+        self.send()
+        self.send()
+        self.assertEqual(self.server.noops, 1)
+        self.server.drop_connections()
+
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_reconnects_when_the_server_closed_a_pooled_connection(self):
+        self.send()
+        self.server.drop_connections()
+
+        self.assertEqual(self.send(2), 2)
+        self.assertEqual(self.server.noops, 0)
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(len(self.server.messages), 3)
+
+    @override_settings(EMAIL_POOL_SIZE=1)
+    def test_pool_keeps_at_most_pool_size_connections(self):
+        first, second = mail.get_connection(), mail.get_connection()
+        first.open()
+        second.open()
+        first.close()
+        second.close()
+
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(sum(len(idle) for idle in smtp_pool.idle.values()), 1)
+        self.assertIsInstance(first, PooledSMTPEmailBackend)
+
+
+class KeysetPaginationTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.homeworks = [make_homework(self.user, title=f'Tarea {i}') for i in range(5)]
+
+    def test_read_tarea_pages_follow_primary_key(self):
+        response = self.client.get(reverse('read-tarea'), {'limit': 2})
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         [homework.pk for homework in self.homeworks[:2]])
+
+        seen = []
+        url = reverse('read-tarea') + '?limit=2'
+        while url:
+            response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [homework.pk for homework in self.homeworks])
+
+    def test_limit_is_capped(self):
+        request = Request(APIRequestFactory().get('/', {'limit': 10 ** 6}))
+        self.assertEqual(KeysetPagination().get_page_size(request), KeysetPagination.max_page_size)
+
+    def test_cursor_with_offset_is_rejected(self):
+        cursor = base64.b64encode(f'o=1000000&p={self.homeworks[0].pk}'.encode()).decode()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('read-tarea'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_empty_list_keeps_status_message(self):
+        Homework.objects.all().delete()
+        response = self.client.get(reverse('read-tarea'))
+        self.assertEqual(response.data, {'status': 'No se han agregado usuarios'})
+
+
+class UserHomeworksTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = [make_user(name=f'Ana {i}', email=f'ana{i}@example.com', phone_number=f'30012345{i:02d}')
+                      for i in range(3)]
+        for user in self.users:
+            for i in range(4):
+                make_homework(user, title=f'Tarea {i}', status='CP'[i % 2])
+            make_homework(user, title='Hecha', status='T')
+
+    def test_users_come_with_their_open_tasks(self):
+        response = self.client.get(reverse('read-user-tareas'))
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([row['id'] for row in results], [user.pk for user in self.users])
+        first = results[0]
+        self.assertEqual(first['name'], 'Ana 0')
+        self.assertEqual(first['tareas_count'], 4)
+        self.assertEqual([tarea['title'] for tarea in first['tareas']], [f'Tarea {i}' for i in range(4)])
+        self.assertEqual(first['tareas'][1]['status'], dict(Homework.STATUS_CHOICES)['P'])
+        self.assertEqual(set(first['tareas'][0]), {'id', 'title', 'description', 'time', 'status'})
+
+    def test_query_count_does_not_grow_with_users(self):
+        # usuarios con su total de tareas abiertas y las tareas de la página
+        with self.assertNumQueries(2):
+            self.client.get(reverse('read-user-tareas'))
+        for i in range(3, 8):
+            make_homework(make_user(name=f'Ana {i}', email=f'ana{i}@example.com', phone_number=f'30012345{i:02d}'))
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('read-user-tareas'))
+        self.assertEqual(len(response.data['results']), 8)
+
+    def test_tareas_limit_caps_tasks_per_user(self):
+        response = self.client.get(reverse('read-user-tareas'), {'tareas_limit': 2})
+        for row in response.data['results']:
+            self.assertEqual([tarea['title'] for tarea in row['tareas']], ['Tarea 0', 'Tarea 1'])
+            self.assertEqual(row['tareas_count'], 4)
+
+    @override_settings(USER_TAREAS_MAX_LIMIT=10)
+    def test_invalid_tareas_limit_is_rejected(self):
+        for value in ('0', 'x', '11'):
+            response = self.client.get(reverse('read-user-tareas'), {'tareas_limit': value})
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn('tareas_limit', response.data)
+
+    def test_deleted_users_are_excluded(self):
+        self.users[1].status = False
+        self.users[1].save()
+        response = self.client.get(reverse('read-user-tareas'))
+        self.assertEqual([row['id'] for row in response.data['results']], [self.users[0].pk, self.users[2].pk])
+
+    def test_pages_follow_primary_key(self):
+        seen = []
+        url = reverse('read-user-tareas') + '?limit=2&tareas_limit=1'
+        while url:
+            response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            self.assertTrue(all(len(row['tareas']) == 1 for row in response.data['results']))
+            url = response.data['next']
+        self.assertEqual(seen, [user.pk for user in self.users])
+
+    def test_list_is_invalidated_when_a_task_changes(self):
+        self.client.get(reverse('read-user-tareas'))
+        homework = Homework.objects.get(user=self.users[0], title='Tarea 0')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('update-tarea', args=[homework.pk]), {'status': 'T'})
+        response = self.client.get(reverse('read-user-tareas'))
+        self.assertEqual(response.data['results'][0]['tareas_count'], 3)
+
+    def test_empty_list_keeps_status_message(self):
+        User.objects.update(status=False)
+        response = self.client.get(reverse('read-user-tareas'))
+        self.assertEqual(response.data, {'status': 'No se han agregado usuarios'})
+
+
+class QueryBudgetTests(TareasTestCase):
+    """Número máximo de consultas por endpoint; si sube, hay una regresión."""
+
+    def setUp(self):
+        super().setUp()
+        self.users = [make_user(name=f'Ana {i}', email=f'ana{i}@example.com', phone_number=f'30012345{i:02d}')
+                      for i in range(10)]
+        self.homeworks = [make_homework(user, title=f'Tarea {i}') for i, user in enumerate(self.users)]
+        self.user = self.users[0]
+        self.homework = self.homeworks[0]
+
+    def test_read_user(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('read-user'))
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_read_tarea_does_not_grow_with_rows(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('read-tarea'))
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][3]['user']['username'], 'Ana Garcia')
+
+    # En los tests cada ``transaction.atomic`` suma un SAVEPOINT y su RELEASE.
+
+    def test_create_user(self):
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('create-user'), {
+                'name': 'Luis', 'last_name': 'Perez', 'email': 'luis@example.com', 'phone_number': '3009876543',
+                'active': True,
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_update_user(self):
+        with self.assertNumQueries(4):
+            response = self.client.patch(reverse('update-user', args=[self.user.pk]), {'last_name': 'Lopez'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_user(self):
+        with self.assertNumQueries(2):
+            response = self.client.delete(reverse('delete-user', args=[self.user.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_tarea(self):
+        # usuario, búsqueda de duplicado, INSERT de la tarea, del evento SSE y del correo
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse('create-tarea'), {
+                'title': 'Nueva', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk,
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_task_events_reuse_the_loaded_user(self):
+        # El payload del evento SSE usa el usuario ya cargado, sin otra consulta por tarea
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('bulk-create-tarea'), [
+                {'title': f'Nueva {i}', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': user.pk}
+                for i, user in enumerate(self.users)
+            ], format='json')
+        self.assertEqual(response.status_code, 201)
+        user_queries = [query for query in queries if 'FROM "tareas_user"' in query['sql']]
+        self.assertEqual(len(user_queries), 1, user_queries)
+
+    def test_update_tarea(self):
+        # tarea con su usuario, UPDATE, evento SSE y el aviso (UPDATE del pendiente e INSERT)
+        with self.assertNumQueries(7):
+            response = self.client.patch(reverse('update-tarea', args=[self.homework.pk]), {'status': 'P'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_tarea_with_same_user_reuses_it(self):
+        with self.assertNumQueries(7):
+            response = self.client.put(reverse('update-tarea', args=[self.homework.pk]), {
+                'title': 'Tarea 0', 'description': 'Otra', 'time': '09:30:00', 'status': 'C',
+                'user': self.user.pk,
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_tarea(self):
+        with self.assertNumQueries(8):
+            response = self.client.delete(reverse('delete-tarea', args=[self.homework.pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+class HomeworkWritePathTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.homework = make_homework(self.user, title='Preparar informe')
+
+    def test_create_reuses_open_homework_with_same_normalized_title(self):
+        response = self.client.post(reverse('create-tarea'), {
+            'title': '  preparar   INFORME ', 'description': 'x', 'time': '09:00:00', 'status': 'P',
+            'user': self.user.pk,
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['id'], self.homework.pk)
+        self.assertEqual(Homework.objects.count(), 1)
+        self.assertEqual(Homework.objects.get().status, 'P')
+
+    def test_unknown_user_message(self):
+        response = self.client.post(reverse('create-tarea'), {
+            'title': 'Nueva', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': 9999,
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['user'], ['El usuario ingresado no existe'])
+
+    def test_update_writes_only_changed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(reverse('update-tarea', args=[self.homework.pk]), {
+                'title': 'nuevo  informe', 'status': 'C'})
+
+        self.assertEqual(response.status_code, 200)
+        [update] = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "tareas_homework"')]
+        self.assertIn('"title"', update)
+        self.assertIn('"title_normalized"', update)
+        self.assertNotIn('"status"', update)
+        self.assertNotIn('"description"', update)
+        self.homework.refresh_from_db()
+        self.assertEqual(self.homework.title, 'Nuevo Informe')
+        self.assertEqual(self.homework.title_normalized, 'nuevo informe')
+
+    def test_update_to_another_user(self):
+        other = make_user(name='Luis', email='luis@example.com', phone_number='3009876543')
+
+        response = self.client.patch(reverse('update-tarea', args=[self.homework.pk]), {'user': other.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['id'], other.pk)
+        self.assertEqual(Notification.objects.get().recipient, 'luis@example.com')
+
+
+class IdempotencyKeyTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.payload = {'title': 'Nueva', 'description': 'x', 'time': '09:00:00', 'status': 'C',
+                        'user': self.user.pk}
+
+    def post(self, key, payload=None):
+        return self.client.post(reverse('create-tarea'), payload or self.payload, format='json',
+                                HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_returns_stored_response_without_side_effects(self):
+        first = self.post('abc')
+        with self.assertNumQueries(1):
+            second = self.post('abc')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Homework.objects.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_same_key_with_other_payload_is_rejected(self):
+        self.post('abc')
+        response = self.post('abc', dict(self.payload, title='Otra'))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Homework.objects.count(), 1)
+
+    def test_keys_are_scoped_by_route(self):
+        self.post('abc')
+        response = self.client.post(reverse('create-user'), {
+            'name': 'Luis', 'last_name': 'Perez', 'email': 'luis@example.com', 'phone_number': '3009876543',
+            'active': True}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, 201)
+
+    def test_failed_request_releases_key(self):
+        response = self.post('abc', dict(self.payload, time='23:00:00'))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_concurrent_request_gets_conflict(self):
+        IdempotencyKey.objects.create(key='abc', route='create-tarea',
+                                      request_hash=self.request_hash())
+        response = self.post('abc')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Homework.objects.exists())
+
+    def test_concurrent_request_waits_for_original(self):
+        record = IdempotencyKey.objects.create(key='abc', route='create-tarea',
+                                               request_hash=self.request_hash())
+
+        def finish_original(seconds):
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status='D', response_status=201, response_body={'id': 99})
+
+        with mock.patch('tareas.api.mixins.time.sleep', side_effect=finish_original):
+            response = self.post('abc')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'id': 99})
+        self.assertFalse(Homework.objects.exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0, IDEMPOTENCY_CLAIM_LEASE=60)
+    def test_abandoned_claim_is_taken_over_after_lease(self):
+        # El worker que reclamó la llave murió sin terminar ni liberarla
+        record = IdempotencyKey.objects.create(
+            key='abc', route='create-tarea', request_hash=self.request_hash(),
+            claimed_at=timezone.now() - datetime.timedelta(seconds=61))
+
+        response = self.post('abc')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Homework.objects.count(), 1)
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.response_body['id']), ('D', response.data['id']))
+        self.assertEqual(self.post('abc')['Idempotent-Replayed'], 'true')
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0, IDEMPOTENCY_CLAIM_LEASE=60)
+    def test_claim_within_lease_is_not_taken_over(self):
+        IdempotencyKey.objects.create(
+            key='abc', route='create-tarea', request_hash=self.request_hash(),
+            claimed_at=timezone.now() - datetime.timedelta(seconds=30))
+        self.assertEqual(self.post('abc').status_code, 409)
+        self.assertFalse(Homework.objects.exists())
+
+    def test_taken_over_request_leaves_the_new_claim_alone(self):
+        invalid = dict(self.payload, time='23:00:00')
+        original = IdempotencyKey.objects.create(key='abc', route='create-tarea',
+                                                 request_hash=self.request_hash(invalid))
+        # Otra petición la tomó por vencida mientras la original seguía
+        IdempotencyKey.objects.filter(pk=original.pk).update(claimed_at=timezone.now())
+
+        with mock.patch('tareas.api.mixins.IdempotentCreateMixin.claim_idempotency_key',
+                        return_value=(original, True)):
+            self.assertEqual(self.post('abc', invalid).status_code, 400)
+        self.assertTrue(IdempotencyKey.objects.filter(pk=original.pk, status='P').exists())
+
+    def test_expired_key_is_claimed_again(self):
+        IdempotencyKey.objects.create(key='abc', route='create-tarea', request_hash='otro',
+                                      created_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        self.assertEqual(self.post('abc').status_code, 201)
+
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def request_hash(self, payload=None):
+        from tareas.api.mixins import IdempotentCreateMixin
+        request = Request(APIRequestFactory().post('/', payload or self.payload, format='json'),
+                          parsers=[JSONParser()])
+        return IdempotentCreateMixin.get_request_hash(request)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class ChangesTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.homeworks = [make_homework(self.user, title=f'Tarea {i}') for i in range(3)]
+
+    def changes(self, token=None, **params):
+        if token:
+            params['since'] = token
+        response = self.client.get(reverse('changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_sync_then_only_changes(self):
+        with self.assertNumQueries(2):
+            data = self.changes()
+        self.assertEqual([row['id'] for row in data['users']], [self.user.pk])
+        self.assertEqual([row['id'] for row in data['tareas']], [homework.pk for homework in self.homeworks])
+        self.assertEqual(data['tareas'][0], HomeworkSerializer(self.homeworks[0]).data)
+        self.assertFalse(data['has_more'])
+
+        empty = self.changes(data['token'])
+        self.assertEqual((empty['users'], empty['tareas']), ([], []))
+
+        self.client.patch(reverse('update-tarea', args=[self.homeworks[1].pk]), {'status': 'P'})
+        data = self.changes(empty['token'])
+        self.assertEqual([row['id'] for row in data['tareas']], [self.homeworks[1].pk])
+        self.assertEqual(data['tareas'][0]['status'], 'En proceso')
+        self.assertEqual(data['users'], [])
+
+    def test_soft_deletes_become_tombstones(self):
+        token = self.changes()['token']
+        self.client.delete(reverse('delete-tarea', args=[self.homeworks[0].pk]))
+        self.client.delete(reverse('delete-user', args=[self.user.pk]))
+
+        data = self.changes(token)
+        self.assertEqual(data['deleted'], {'users': [self.user.pk], 'tareas': [self.homeworks[0].pk]})
+        self.assertEqual((data['users'], data['tareas']), ([], []))
+
+    def test_limit_pages_through_changes(self):
+        seen, token = [], None
+        for _ in range(10):
+            data = self.changes(token, limit=1)
+            seen.extend(row['id'] for row in data['tareas'])
+            token = data['token']
+            if not data['has_more']:
+                break
+        self.assertEqual(seen, [homework.pk for homework in self.homeworks])
+
+    def test_bulk_updates_touch_updated_at(self):
+        token = self.changes()['token']
+        self.client.post(reverse('bulk-create-tarea'), [
+            {'title': 'Tarea 2', 'description': 'x', 'time': '09:00:00', 'status': 'P', 'user': self.user.pk},
+        ], format='json')
+        self.assertEqual([row['id'] for row in self.changes(token)['tareas']], [self.homeworks[2].pk])
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_recent_rows_are_sent_again_until_settled(self):
+        data = self.changes()
+        again = self.changes(data['token'])
+        self.assertEqual(len(again['tareas']), 3)
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_token_does_not_pass_unsettled_rows_between_pages(self):
+        data = self.changes(limit=1)
+        self.assertFalse(data['has_more'])
+        # El token no avanzó más allá de la primera tarea aún sin asentar
+        again = self.changes(data['token'], limit=3)
+        self.assertEqual([row['id'] for row in again['tareas']], [homework.pk for homework in self.homeworks])
+
+    def test_empty_update_fields_does_not_save(self):
+        updated_at = self.homeworks[0].updated_at
+        with self.assertNumQueries(0):
+            self.homeworks[0].save(update_fields=[])
+            self.user.save(update_fields=[])
+        self.assertEqual(Homework.objects.get(pk=self.homeworks[0].pk).updated_at, updated_at)
+
+    def test_invalid_token(self):
+        response = self.client.get(reverse('changes'), {'since': 'no-es-un-token'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['since'], ['Token de sincronización inválido.'])
+
+
+class SSEClient:
+    """Abre el feed SSE llamando directamente a la aplicación ASGI de ``config/asgi.py``."""
+
+    def __init__(self, query='', headers=(), send_gate=None):
+        self.inbox = asyncio.Queue()
+        self.messages = []
+        self.body = b''
+        self.updated = asyncio.Event()
+        self.send_gate = send_gate
+        scope = {'type': 'http', 'method': 'GET', 'path': settings.SSE_PATH,
+                 'query_string': query.encode(), 'headers': list(headers)}
+        self.task = asyncio.ensure_future(asgi_application(scope, self.inbox.get, self.send))
+
+    async def send(self, message):
+        if self.send_gate is not None and message['type'] == 'http.response.body':
+            await self.send_gate.wait()
+        self.messages.append(message)
+        self.body += message.get('body', b'')
+        self.updated.set()
+
+    @property
+    def status(self):
+        return self.messages[0]['status'] if self.messages else None
+
+    @property
+    def finished(self):
+        return any(message['type'] == 'http.response.body' and not message.get('more_body')
+                   for message in self.messages)
+
+    def events(self):
+        parsed = []
+        for block in self.body.decode().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line and line[0] != ':')
+            if 'event' in fields:
+                parsed.append(fields)
+        return parsed
+
+    async def wait_until(self, predicate, timeout=5):
+        async def wait():
+            while not predicate():
+                self.updated.clear()
+                await self.updated.wait()
+        await asyncio.wait_for(wait(), timeout)
+
+    async def wait_events(self, count, timeout=5):
+        await self.wait_until(lambda: len(self.events()) >= count, timeout)
+        return self.events()
+
+    async def close(self):
+        await self.inbox.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(self.task, 5)
+
+
+class StreamTestMixin:
+    def setUp(self):
+        super().setUp()
+        # Un broadcaster nuevo por test: el de módulo guarda el loop y el último id leído
+        self.broadcaster = events.Broadcaster()
+        for module in (events, sse):
+            patcher = mock.patch.object(module, 'broadcaster', self.broadcaster)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, 30))
+
+
+@override_settings(SSE_BROADCAST_BACKEND='memory')
+class HomeworkStreamTests(StreamTestMixin, TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.other = make_user(name='Luis', email='luis@example.com', phone_number='3007654321')
+
+    def publish(self, user, event='updated', payload='{}'):
+        self.broadcaster.publish([(user.pk, event, payload)])
+
+    def test_writes_are_replayed_from_last_event_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('create-tarea'), {
+                'title': 'Nueva', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk,
+            })
+        homework = Homework.objects.get(pk=response.data['id'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('update-tarea', args=[homework.pk]), {'status': 'P'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('delete-tarea', args=[homework.pk]))
+
+        async def scenario():
+            client = SSEClient(headers=[(b'last-event-id', b'0')])
+            received = await client.wait_events(3)
+            await client.close()
+            resumed = SSEClient(query=f'last_event_id={received[0]["id"]}')
+            later = await resumed.wait_events(2)
+            await resumed.close()
+            return client, received, later
+
+        client, received, later = self.run_async(scenario())
+        headers = dict(client.messages[0]['headers'])
+        self.assertEqual(client.status, 200)
+        self.assertEqual(headers[b'content-type'], b'text/event-stream')
+        self.assertEqual(headers[b'cache-control'], b'no-cache')
+        self.assertEqual([event['event'] for event in received], ['created', 'updated', 'deleted'])
+        homework.refresh_from_db()
+        self.assertEqual(json.loads(received[0]['data'])['title'], 'Nueva')
+        self.assertEqual(json.loads(received[1]['data'])['status'], 'En proceso')
+        self.assertEqual(json.loads(received[2]['data']), {'id': homework.pk, 'user': {'id': self.user.pk}})
+        self.assertEqual(later, received[1:])
+
+    def test_live_events_filtered_by_user(self):
+        async def scenario():
+            everyone = SSEClient()
+            mine = SSEClient(query=f'user={self.user.pk}')
+            await everyone.wait_until(lambda: everyone.status == 200)
+            await mine.wait_until(lambda: mine.status == 200)
+            self.publish(self.other, payload='{"id": 1}')
+            self.publish(self.user, payload='{"id": 2}')
+            await everyone.wait_events(2)
+            received = await mine.wait_events(1)
+            await everyone.close()
+            await mine.close()
+            return everyone.events(), received
+
+        everyone, mine = self.run_async(scenario())
+        self.assertEqual([event['data'] for event in everyone], ['{"id": 1}', '{"id": 2}'])
+        self.assertEqual([event['data'] for event in mine], ['{"id": 2}'])
+        self.assertEqual(self.broadcaster.subscriptions, set())
+
+    @override_settings(SSE_HEARTBEAT_SECONDS=0.01)
+    def test_sends_heartbeat_while_idle(self):
+        async def scenario():
+            client = SSEClient()
+            await client.wait_until(lambda: client.body.count(b': ping\n\n') >= 2)
+            await client.close()
+
+        self.run_async(scenario())
+
+    @override_settings(SSE_REPLAY_LIMIT=2)
+    def test_reset_when_events_are_no_longer_kept(self):
+        self.broadcaster = events.Broadcaster()
+        for module in (events, sse):
+            patcher = mock.patch.object(module, 'broadcaster', self.broadcaster)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for _ in range(4):
+            self.publish(self.user)
+
+        async def scenario():
+            client = SSEClient(headers=[(b'last-event-id', b'1')])
+            await client.wait_until(lambda: b'event: reset' in client.body)
+            await client.close()
+
+        self.run_async(scenario())
+
+    @override_settings(SSE_QUEUE_SIZE=2)
+    def test_slow_client_is_disconnected(self):
+        async def scenario():
+            gate = asyncio.Event()
+            client = SSEClient(send_gate=gate)
+            await asyncio.sleep(0.01)
+            for _ in range(5):
+                self.publish(self.user)
+            await asyncio.sleep(0.01)
+            gate.set()
+            await client.wait_until(lambda: client.finished)
+            await client.close()
+            return client
+
+        client = self.run_async(scenario())
+        self.assertEqual(len(client.events()), 2)
+        self.assertEqual(self.broadcaster.subscriptions, set())
+
+    @override_settings(SSE_MAX_CONNECTIONS=1)
+    def test_rejects_bad_requests_and_too_many_connections(self):
+        async def scenario():
+            invalid = SSEClient(query='user=abc')
+            await invalid.wait_until(lambda: invalid.finished)
+            first = SSEClient()
+            await first.wait_until(lambda: first.status == 200)
+            second = SSEClient()
+            await second.wait_until(lambda: second.finished)
+            await first.close()
+            return invalid, second
+
+        invalid, second = self.run_async(scenario())
+        self.assertEqual(invalid.status, 400)
+        self.assertEqual(second.status, 503)
+        self.assertIn((b'retry-after', b'3'), second.messages[0]['headers'])
+
+    @override_settings(SSE_MAX_CONNECTIONS=2000)
+    def test_many_idle_connections_receive_one_event(self):
+        connections = 1000
+
+        async def scenario():
+            clients = [SSEClient(query=f'user={self.user.pk}' if i % 2 else '') for i in range(connections)]
+            await asyncio.gather(*(client.wait_until(lambda client=client: client.status == 200)
+                                   for client in clients))
+            self.assertEqual(len(self.broadcaster.subscriptions), connections)
+            start = time.perf_counter()
+            self.publish(self.user)
+            await asyncio.gather(*(client.wait_events(1) for client in clients))
+            elapsed = time.perf_counter() - start
+            await asyncio.gather(*(client.close() for client in clients))
+            return elapsed
+
+        elapsed = self.run_async(scenario())
+        self.assertLess(elapsed, 5)
+        self.assertEqual(self.broadcaster.subscriptions, set())
+
+
+@override_settings(SSE_BROADCAST_BACKEND='database', SSE_POLL_INTERVAL=0.01)
+class HomeworkStreamDatabaseTests(StreamTestMixin, TransactionTestCase):
+    """Los eventos pasan por ``HomeworkEvent``, como cuando escribe un worker WSGI."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = make_user()
+        self.other = make_user(name='Luis', email='luis@example.com', phone_number='3007654321')
+
+    def test_events_written_by_another_process_reach_the_stream(self):
+        first = make_homework(self.user, title='Antes de conectar')
+
+        async def scenario():
+            client = SSEClient(query=f'user={self.user.pk}')
+            await client.wait_until(lambda: client.status == 200)
+            await sync_to_async(make_homework)(self.other, title='De otro')
+            homework = await sync_to_async(make_homework)(self.user, title='Nueva')
+            received = await client.wait_events(1)
+            await client.close()
+            resumed = SSEClient(headers=[(b'last-event-id', b'0')])
+            replayed = await resumed.wait_events(3)
+            await resumed.close()
+            return homework, received, replayed
+
+        homework, received, replayed = self.run_async(scenario())
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['event'], 'created')
+        self.assertEqual(received[0]['data'], JSONRenderer().render(HomeworkSerializer(homework).data).decode())
+        self.assertEqual([json.loads(event['data'])['title'] for event in replayed],
+                         [first.title, 'De otro', 'Nueva'])
+        self.assertEqual(HomeworkEvent.objects.count(), 3)
+
+    @override_settings(SSE_POLL_INTERVAL=0.05)
+    def test_poller_restart_skips_events_written_while_nobody_listened(self):
+        async def scenario():
+            client = SSEClient()
+            await client.wait_until(lambda: client.status == 200)
+            await client.close()
+            await asyncio.wait_for(self.broadcaster.poller, 5)
+            for i in range(3):
+                await sync_to_async(make_homework)(self.user, title=f'Sin nadie {i}')
+
+            client = SSEClient()
+            await client.wait_until(lambda: client.status == 200)
+            await sync_to_async(make_homework)(self.user, title='Nueva')
+            received = await client.wait_events(1)
+            await asyncio.sleep(0.2)
+            await client.close()
+            return client.events()
+
+        received = self.run_async(scenario())
+        self.assertEqual([json.loads(event['data'])['title'] for event in received], ['Nueva'])
+
+    @override_settings(SSE_POLL_INTERVAL=0.05, SSE_POLL_BATCH_SIZE=2)
+    def test_poller_reads_in_batches(self):
+        async def scenario():
+            client = SSEClient()
+            await client.wait_until(lambda: client.status == 200)
+            await sync_to_async(self.client.post)(reverse('bulk-create-tarea'), json.dumps([
+                {'title': f'Tarea {i}', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk}
+                for i in range(5)
+            ]), content_type='application/json')
+            received = await client.wait_events(5)
+            await client.close()
+            return received
+
+        self.assertEqual(len(self.run_async(scenario())), 5)
+
+    @override_settings(SSE_EVENT_RETENTION=0)
+    def test_prune_events_and_reset(self):
+        make_homework(self.user)
+        make_homework(self.user, title='Otra')
+        events.prune_events()
+        self.assertEqual(HomeworkEvent.objects.count(), 0)
+        make_homework(self.user, title='Tercera')
+
+        async def scenario():
+            client = SSEClient(headers=[(b'last-event-id', b'1')])
+            await client.wait_until(lambda: b'event: reset' in client.body)
+            await client.close()
+
+        self.run_async(scenario())
+
+
+class UniqueContactTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def post_user(self, **kwargs):
+        data = {'name': 'Luis', 'last_name': 'Perez', 'email': 'luis@example.com', 'phone_number': '3009876543',
+                'active': True}
+        data.update(kwargs)
+        return self.client.post(reverse('create-user'), data)
+
+    def test_duplicate_email_is_rejected_by_constraint(self):
+        response = self.post_user(email='ana@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ['El correo electrónico ya está en uso.'])
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_duplicate_phone_is_rejected_by_constraint(self):
+        response = self.post_user(phone_number='3001234567')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ['El número de teléfono ya está en uso.'])
+
+    def test_taken_contact_does_not_reactivate_inactive_user(self):
+        inactive = make_user(name='Luis', email='viejo@example.com', phone_number='3000000000', active=False)
+        for contact in ({'email': 'ana@example.com'}, {'phone_number': '3001234567'}):
+            response = self.post_user(**contact)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('ya está en uso', response.data[0])
+        inactive.refresh_from_db()
+        self.assertFalse(inactive.active)
+
+    def test_free_contact_reactivates_inactive_user(self):
+        inactive = make_user(name='Luis', email='viejo@example.com', phone_number='3000000000', active=False)
+        with self.assertNumQueries(4):
+            response = self.post_user()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['id'], inactive.pk)
+        inactive.refresh_from_db()
+        self.assertTrue(inactive.active)
+
+    def test_violation_message_uses_constraint_name(self):
+        for message in ('duplicate key value violates unique constraint "tareas_user_email_unique"',
+                        'UNIQUE constraint failed: tareas_user.email'):
+            self.assertEqual(unique_violation_message(IntegrityError(message)),
+                             'El correo electrónico ya está en uso.')
+        with self.assertRaises(IntegrityError):
+            unique_violation_message(IntegrityError('NOT NULL constraint failed: tareas_user.name'))
+
+    def test_update_to_taken_email_is_rejected(self):
+        other = make_user(name='Luis', email='luis@example.com', phone_number='3009876543')
+        response = self.client.patch(reverse('update-user', args=[other.pk]), {'email': 'ana@example.com'})
+        self.assertEqual(response.status_code, 400)
+        other.refresh_from_db()
+        self.assertEqual(other.email, 'luis@example.com')
+
+    def test_database_enforces_uniqueness(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_user(name='Otra', phone_number='3000000000')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_user(name='Otra', email='otra@example.com')
+
+    def test_empty_contact_fields_are_not_unique(self):
+        make_user(name='Uno', email='', phone_number='')
+        make_user(name='Dos', email='', phone_number='')
+        self.assertEqual(User.objects.filter(email='').count(), 2)
+
+
+class BulkCreateTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.other = make_user(name='Luis', email='luis@example.com', phone_number='3009876543')
+
+    def test_bulk_create_users_reports_item_errors(self):
+        payload = [
+            {'name': 'Eva', 'last_name': 'Ruiz', 'email': 'eva@example.com', 'phone_number': '3001112233',
+             'active': True},
+            {'name': 'Eva', 'last_name': 'Ruiz', 'email': 'ana@example.com', 'phone_number': '3001112234',
+             'active': True},
+            {'name': 'Eva', 'last_name': 'Ruiz', 'email': 'eva@example.com', 'phone_number': '3001112235',
+             'active': True},
+            {'name': '', 'last_name': 'Ruiz', 'email': 'x@example.com', 'phone_number': '3001112236',
+             'active': True},
+        ]
+
+        with self.assertNumQueries(8):
+            response = self.client.post(reverse('bulk-create-user'), payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([user['email'] for user in response.data['created']], ['eva@example.com'])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.assertEqual(response.data['errors'][0]['errors'], ['El correo electrónico ya está en uso.'])
+        created = User.objects.get(email='eva@example.com')
+        self.assertEqual(response.data['created'][0]['id'], created.pk)
+
+    def test_bulk_create_tareas_sends_one_email_per_user(self):
+        make_homework(self.user, title='Abierta')
+        payload = [
+            {'title': 'Uno', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk},
+            {'title': 'Dos', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk},
+            {'title': 'Tres', 'description': 'x', 'time': '10:00:00', 'status': 'C', 'user': self.other.pk},
+            {'title': 'Abierta', 'description': 'x', 'time': '10:00:00', 'status': 'P', 'user': self.user.pk},
+            {'title': 'Cuatro', 'description': 'x', 'time': '10:00:00', 'status': 'C', 'user': 999},
+            {'title': 'Cinco', 'description': 'x', 'time': '23:00:00', 'status': 'C', 'user': self.user.pk},
+        ]
+
+        with self.assertNumQueries(11):
+            response = self.client.post(reverse('bulk-create-tarea'), payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['title'] for row in response.data['created']], ['Uno', 'Dos', 'Tres', 'Abierta'])
+        self.assertEqual([error['index'] for error in response.data['errors']], [4, 5])
+        self.assertEqual(response.data['errors'][0]['errors']['user'], ['El usuario ingresado no existe'])
+        self.assertEqual(Homework.objects.get(title='Abierta').status, 'P')
+        self.assertEqual(
+            sorted(Notification.objects.values_list('recipient', flat=True)),
+            ['ana@example.com', 'ana@example.com', 'luis@example.com'])
+        self.assertEqual(
+            [row['id'] for row in response.data['created'][:3]],
+            list(Homework.objects.filter(title__in=['Uno', 'Dos', 'Tres']).order_by('pk').values_list('pk', flat=True)))
+
+    def test_bulk_create_does_not_merge_untitled_tareas(self):
+        untitled = make_homework(self.user, title=None)
+        payload = [
+            {'description': 'Primera', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk},
+            {'title': None, 'description': 'Segunda', 'time': '09:00:00', 'status': 'P', 'user': self.user.pk},
+        ]
+
+        response = self.client.post(reverse('bulk-create-tarea'), payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        ids = [row['id'] for row in response.data['created']]
+        self.assertEqual(len(set(ids) | {untitled.pk}), 3)
+        self.assertEqual(
+            list(Homework.objects.filter(pk__in=ids).order_by('pk').values_list('description', 'status')),
+            [('Primera', 'C'), ('Segunda', 'P')])
+        self.assertEqual(Homework.objects.get(pk=untitled.pk).status, untitled.status)
+
+    def test_bulk_create_requires_a_list(self):
+        response = self.client.post(reverse('bulk-create-tarea'), {'title': 'Uno'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ListCacheTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        make_homework(self.user)
+
+    def test_cached_list_skips_database(self):
+        first = self.client.get(reverse('read-tarea'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('read-tarea'))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(reverse('read-user'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('read-user'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.assertNotEqual(
+            self.client.get(reverse('read-tarea'))['ETag'],
+            self.client.get(reverse('read-tarea'), {'limit': 1})['ETag'])
+
+    def test_saving_a_user_invalidates_both_lists(self):
+        tareas_etag = self.client.get(reverse('read-tarea'))['ETag']
+        users_etag = self.client.get(reverse('read-user'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('update-user', args=[self.user.pk]), {'last_name': 'Lopez'})
+
+        response = self.client.get(reverse('read-tarea'), HTTP_IF_NONE_MATCH=tareas_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['user']['username'], 'Ana Lopez')
+        self.assertNotEqual(self.client.get(reverse('read-user'))['ETag'], users_etag)
+
+    def test_bulk_create_invalidates_list(self):
+        etag = self.client.get(reverse('read-tarea'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('bulk-create-tarea'), [
+                {'title': 'Otra', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk},
+            ], format='json')
+        response = self.client.get(reverse('read-tarea'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+    def test_concurrent_bumps_are_not_lost(self):
+        version = get_list_version('read-tarea')
+        # Dos workers que leen la misma versión antes de escribir la suya
+        bumped = []
+        for _ in range(2):
+            with mock.patch.object(cache, 'get', return_value=version):
+                bump_list_versions('read-tarea')
+            bumped.append(get_list_version('read-tarea'))
+        self.assertEqual(len({version, *bumped}), 3)
+
+
+class HomeworkFilterTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ana = make_user()
+        self.luis = make_user(name='Luis', email='luis@example.com', phone_number='3009876543')
+        self.morning = make_homework(self.ana, title='Temprano', time=datetime.time(7, 0))
+        self.noon = make_homework(self.ana, title='Mediodia', time=datetime.time(12, 0), status='P')
+        self.done = make_homework(self.luis, title='Lista', time=datetime.time(12, 0), status='T')
+
+    def ids(self, **params):
+        response = self.client.get(reverse('read-tarea'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['id'] for row in response.data['results']]
+
+    def test_default_lists_created_and_in_progress(self):
+        self.assertEqual(self.ids(), [self.morning.pk, self.noon.pk])
+
+    def test_filters(self):
+        self.assertEqual(self.ids(user=self.luis.pk, status='T'), [self.done.pk])
+        self.assertEqual(self.ids(status='C,T'), [self.morning.pk, self.done.pk])
+        self.assertEqual(self.ids(status=['P', 'T'], time_from='11:00'), [self.noon.pk, self.done.pk])
+        self.assertEqual(self.ids(user=self.ana.pk, time_to='08:00'), [self.morning.pk])
+
+    def test_invalid_filters_return_400(self):
+        self.assertEqual(self.client.get(reverse('read-tarea'), {'status': 'X'}).status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse('read-tarea'), {'time_from': '12:00', 'time_to': '08:00'}).status_code, 400)
+
+
+class HomeworkFilterIndexTests(TareasTestCase):
+    """Cada combinación de filtros debe resolverse con un índice, no con un recorrido completo."""
+
+    def query_plan(self, **params):
+        view = HomeworkReadAPIView()
+        view.request = Request(APIRequestFactory().get('/', params))
+        queryset = view.get_queryset().values(*HomeworkSerializer.values_fields).order_by('id')[:51]
+        sql, sql_params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', sql_params)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def assertUsesIndex(self, **params):
+        plan = self.query_plan(**params)
+        self.assertNotRegex(plan, r'SCAN (TABLE )?tareas_homework(?! USING)', plan)
+        self.assertRegex(plan, r'tareas_homework USING (COVERING )?INDEX', plan)
+
+    def test_status(self):
+        self.assertUsesIndex()
+        self.assertUsesIndex(status='T')
+
+    def test_user(self):
+        self.assertUsesIndex(user=1)
+
+    def test_user_and_status(self):
+        self.assertUsesIndex(user=1, status='P')
+
+    def test_time_window(self):
+        self.assertUsesIndex(user=1, time_from='08:00', time_to='12:00')
+        self.assertUsesIndex(time_from='08:00', time_to='12:00')
+
+
+class ExportTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.homeworks = [make_homework(self.user, title=f'Tarea {i}', status=status)
+                          for i, status in enumerate(['C', 'P', 'T'])]
+
+    def test_ndjson_rows_match_read_tarea(self):
+        response = self.client.get(reverse('export-tarea'))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        with self.assertNumQueries(1):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 3)
+        listed = self.client.get(reverse('read-tarea'), HTTP_ACCEPT='application/json').json()['results']
+        self.assertEqual(rows[:2], listed)
+
+    def test_deleted_tasks_are_not_exported(self):
+        self.client.delete(reverse('delete-tarea', args=[self.homeworks[0].pk]))
+        response = self.client.get(reverse('export-tarea'))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.homeworks[1].pk, self.homeworks[2].pk])
+        self.assertNotIn(None, [row['status'] for row in rows])
+
+    def test_csv_by_content_negotiation(self):
+        response = self.client.get(reverse('export-tarea'), {'status': 'T'}, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ['id', 'title', 'description', 'time', 'status', 'user.id', 'user.username'])
+        self.assertEqual(rows[1], [str(self.homeworks[2].pk), 'Tarea 2', 'Informe semanal', '09:30:00',
+                                   'Terminado', str(self.user.pk), 'Ana Garcia'])
+
+
+class ArchiveTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.homeworks = [make_homework(self.user, title=f'Tarea {i}', status='CTPTTT'[i]) for i in range(6)]
+        self.old = [homework.pk for homework in self.homeworks if homework.status == 'T']
+        # update() no pasa por auto_now
+        Homework.objects.filter(pk__in=self.old).update(updated_at=timezone.now() - datetime.timedelta(days=40))
+        Homework.objects.filter(pk=self.homeworks[2].pk).update(
+            updated_at=timezone.now() - datetime.timedelta(days=40))
+
+    def test_old_finished_tasks_move_in_batches(self):
+        events = HomeworkEvent.objects.count()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertEqual(archive_homeworks(batch_size=3), 4)
+        # Una invalidación del listado por lote, no una por tarea
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(list(HomeworkArchive.objects.order_by('id').values_list('id', flat=True)), self.old)
+        self.assertEqual(list(Homework.objects.order_by('id').values_list('id', flat=True)),
+                         [self.homeworks[0].pk, self.homeworks[2].pk])
+        archived = HomeworkArchive.objects.get(pk=self.old[0])
+        self.assertEqual((archived.title, archived.user, archived.status), ('Tarea 1', self.user, 'T'))
+        # Archivar no es eliminar: el feed SSE no se entera
+        self.assertEqual(HomeworkEvent.objects.count(), events)
+
+    def test_recent_tasks_and_pending_notifications_stay(self):
+        Homework.objects.filter(pk=self.old[0]).update(updated_at=timezone.now())
+        Notification.objects.create(recipient='ana@example.com', homework_id=self.old[1], event='completed')
+        self.assertEqual(archive_homeworks(), 2)
+        self.assertEqual(list(HomeworkArchive.objects.order_by('id').values_list('id', flat=True)), self.old[2:])
+        self.assertEqual(archive_homeworks(days=60), 0)
+
+    def test_command_reports_archived_tasks(self):
+        out = StringIO()
+        call_command('archive_tareas', '--days', '30', '--batch-size', '2', stdout=out)
+        self.assertIn('Tareas archivadas: 4', out.getvalue())
+
+    def test_read_tarea_includes_archived_on_request(self):
+        archive_homeworks()
+        self.assertEqual(self.client.get(reverse('read-tarea'), {'status': 'T'}).data,
+                         {'status': 'No se han agregado usuarios'})
+
+        seen = []
+        url = reverse('read-tarea') + '?status=T,C&include_archived=1&limit=2'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [homework.pk for homework in self.homeworks if homework.status in 'TC'])
+        row = self.client.get(reverse('read-tarea'), {'status': 'T', 'include_archived': '1'}).data['results'][0]
+        self.assertEqual(row['status'], 'Terminado')
+        self.assertEqual(row['user'], {'id': self.user.pk, 'username': 'Ana Garcia'})
+
+    def test_open_tasks_do_not_read_the_archive(self):
+        archive_homeworks()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('read-tarea'), {'include_archived': '1'})
+        self.assertNotIn('tareas_homeworkarchive', queries[0]['sql'])
+
+    def test_export_includes_archived_on_request(self):
+        archive_homeworks()
+        response = self.client.get(reverse('export-tarea'), {'include_archived': 'true'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [homework.pk for homework in self.homeworks])
+
+
+class PerformanceMiddlewareTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.reset()
+        self.user = make_user()
+        make_homework(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('read-tarea'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="1 queries"')
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('render;dur=', timing)
+        self.assertRegex(timing, r'total;dur=[\d.]+$')
+
+    def test_email_time_is_reported(self):
+        response = self.client.delete(reverse('delete-tarea', args=[Homework.objects.get().pk]))
+        self.assertIn('email;dur=', response['Server-Timing'])
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('read-tarea'))
+        self.client.get(reverse('read-tarea'))
+
+        body = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('route="read-tarea",method="GET",status="200"} 2', body)
+        self.assertRegex(body, r'tareas_request_duration_seconds_bucket\{[^}]*route="read-tarea"[^}]*le="\+Inf"\} 2')
+        # La segunda petición sale del caché de listados
+        self.assertRegex(body, r'tareas_db_queries_total\{[^}]*route="read-tarea"[^}]*\} 1')
+
+    def test_metrics_is_only_served_to_internal_clients(self):
+        self.assertEqual(reverse('metrics'), '/metrics/')
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='s3creto')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3creto',
+                                   REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 200)
+
+
+class AdmissionControlTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def create_tarea(self, i, **extra):
+        return self.client.post(reverse('create-tarea'), {
+            'title': f'Tarea {i}', 'description': 'x', 'time': '09:00:00', 'status': 'C', 'user': self.user.pk,
+        }, **extra)
+
+    @override_settings(RATE_LIMITS={'create-tarea': {'client': (0.5, 2)}})
+    def test_client_bucket_returns_429_with_retry_after(self):
+        self.assertEqual(self.create_tarea(1).status_code, 201)
+        self.assertEqual(self.create_tarea(2).status_code, 201)
+
+        response = self.create_tarea(3)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(Homework.objects.count(), 2)
+
+        # Otro cliente tiene su propio bucket.
+        self.assertEqual(self.create_tarea(4, REMOTE_ADDR='10.0.0.2').status_code, 201)
+        # Las demás rutas no tienen límite.
+        self.assertEqual(self.client.get(reverse('read-tarea')).status_code, 200)
+
+    @override_settings(RATE_LIMITS={'create-tarea': {'route': (0.5, 1)}})
+    def test_route_bucket_is_shared_by_clients(self):
+        self.assertEqual(self.create_tarea(1).status_code, 201)
+        self.assertEqual(self.create_tarea(2, REMOTE_ADDR='10.0.0.2').status_code, 429)
+
+    @override_settings(RATE_LIMITS={'create-tarea': {'client': (0.5, 1)}},
+                       RATE_LIMIT_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_client_ip_from_proxy_header(self):
+        self.assertEqual(self.create_tarea(1, HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.1').status_code, 201)
+        self.assertEqual(self.create_tarea(2, HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.2').status_code, 201)
+        self.assertEqual(self.create_tarea(3, HTTP_X_FORWARDED_FOR='10.0.0.2').status_code, 429)
+
+    @override_settings(ADMISSION_MAX_CONCURRENT_WRITES=1, RATE_LIMITS={})
+    def test_concurrent_writes_are_rejected_not_queued(self):
+        def make_request(method, route):
+            request = getattr(APIRequestFactory(), method)(reverse(route))
+            request.resolver_match = mock.Mock(url_name=route)
+            request.admission_slot = False
+            return request
+
+        first, second, read = (make_request('post', 'create-tarea'), make_request('post', 'create-tarea'),
+                               make_request('get', 'read-tarea'))
+        responses = []
+
+        def get_response(request):
+            # Django llama a process_view justo antes de la vista; mientras esta
+            # escritura sigue en curso llegan otra escritura y una lectura.
+            self.assertIsNone(middleware.process_view(request, None, (), {}))
+            responses.extend(middleware.process_view(other, None, (), {}) for other in (second, read))
+            return HttpResponse()
+
+        middleware = AdmissionControlMiddleware(get_response)
+        middleware(first)
+
+        rejected, admitted = responses
+        self.assertEqual(rejected.status_code, 429)
+        self.assertEqual(rejected['Retry-After'], '1')
+        self.assertIsNone(admitted)
+        # Al terminar la primera escritura el cupo quedó libre.
+        self.assertIsNone(middleware.process_view(second, None, (), {}))
+
+
+class GunicornConfigTests(TestCase):
+    def load_config(self, **environ):
+        with mock.patch.dict(os.environ, environ), mock.patch('multiprocessing.cpu_count', return_value=4):
+            return runpy.run_path(str(Path(settings.BASE_DIR) / 'gunicorn.conf.py'))
+
+    def test_workers_follow_cpu_count(self):
+        config = self.load_config()
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertEqual((config['workers'], config['threads']), (5, 4))
+        self.assertTrue(config['preload_app'])
+        self.assertGreater(config['max_requests_jitter'], 0)
+
+        config = self.load_config(GUNICORN_WORKER_CLASS='sync')
+        self.assertEqual((config['workers'], config['threads']), (9, 1))
+
+        self.assertEqual(self.load_config(WEB_CONCURRENCY='2')['workers'], 2)
+
+    def test_stream_config_does_not_recycle_workers(self):
+        with mock.patch.dict(os.environ, {'PORT': '5100'}):
+            config = runpy.run_path(str(Path(settings.BASE_DIR) / 'gunicorn_stream.conf.py'))
+        self.assertEqual(config['worker_class'], 'uvicorn.workers.UvicornWorker')
+        self.assertEqual(config['bind'], '0.0.0.0:5100')
+        self.assertEqual(config['max_requests'], 0)
+        self.assertNotIn('preload_app', config)
+        self.assertIn('-c gunicorn_stream.conf.py', (Path(settings.BASE_DIR) / 'Procfile').read_text())
+
+    def test_write_limit_is_below_worker_threads(self):
+        # Con un cupo igual a los hilos el control de admisión nunca rechaza nada
+        self.assertLess(settings.ADMISSION_MAX_CONCURRENT_WRITES, self.load_config()['threads'])
+
+    def test_post_fork_warms_up_worker(self):
+        cache.clear()
+        config = self.load_config()
+
+        with mock.patch('tareas.warmup.connections.close_all') as close_all:
+            config['pre_fork'](mock.Mock(), mock.Mock())
+        close_all.assert_called_once()
+        with CaptureQueriesContext(connection) as queries:
+            config['post_fork'](mock.Mock(), mock.Mock())
+
+        self.assertEqual(len(queries), 2)
+        self.assertIsNotNone(cache.get('tareas:list-version:read-tarea'))
+        self.assertIsNotNone(cache.get('tareas:list-version:read-user'))
+
+    def test_failed_warmup_does_not_kill_worker(self):
+        server = mock.Mock()
+        with mock.patch('tareas.warmup.warmup_worker', side_effect=RuntimeError):
+            self.load_config()['post_fork'](server, mock.Mock())
+        server.log.exception.assert_called_once()
+
+
+class StartupTests(TestCase):
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   rest_framework.settings\n'
+            'import time:      1500 |       1620 | rest_framework\n'
+            'otra línea\n'
+        )
+        self.assertEqual(parse_importtime(output), {
+            'rest_framework.settings': (120, 120),
+            'rest_framework': (1500, 1620),
+        })
+
+    def test_api_settings_skip_admin_and_docs(self):
+        result = profile_startup('config.settings_api')
+
+        # rest_framework.renderers importa módulos de django.contrib.admin, pero
+        # sin la app instalada no se cargan sus modelos.
+        for module in ('drf_yasg', 'django.contrib.admin.models', 'django.contrib.sessions.models'):
+            self.assertNotIn(module, result['loaded'])
+        self.assertIn('tareas.api.views', result['loaded'])
+
+    def test_api_settings_leave_optional_packages_importable(self):
+        result = subprocess.run(
+            [sys.executable, '-c', 'import django; django.setup(); import yaml, requests, jinja2'],
+            cwd=settings.BASE_DIR, env=dict(os.environ, DJANGO_SETTINGS_MODULE='config.settings_api'),
+            capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_api_startup_stays_within_budget(self):
+        # Unos 0.4 s en una máquina de desarrollo; el margen cubre máquinas
+        # cargadas, el mejor de tres descarta un arranque con la caché fría.
+        call_command('startup_profile', '--settings-module', 'config.settings_api', '--runs', '3',
+                     '--budget', '2.0', stdout=StringIO())
+
+    def test_budget_option_fails_command(self):
+        with self.assertRaises(CommandError):
+            call_command('startup_profile', '--settings-module', 'config.settings_api', '--budget', '0',
+                         stdout=StringIO())
+
+    def test_security_middleware_listed_once(self):
+        self.assertEqual(settings.MIDDLEWARE.count('django.middleware.security.SecurityMiddleware'), 1)
+
+
+class FastReadPathTests(TareasTestCase):
+    """Los listados con values() deben producir exactamente los mismos bytes que el camino con modelos."""
+
+    def setUp(self):
+        super().setUp()
+        ana = make_user(name='Ana María', last_name='Núñez Paz')
+        sin_apellido = make_user(name='Luis', last_name=None, email='luis@example.com', phone_number='3009876543')
+        make_homework(ana, title='Informe “final”', description='Línea separada')
+        make_homework(sin_apellido, title='Otra', description=None, time=None, status='P')
+        make_homework(ana, title='Terminada', status='T')
+
+    def legacy_content(self, results):
+        data = OrderedDict([('next', None), ('previous', None), ('results', results)])
+        return renderers.JSONRenderer().render(data, 'application/json', {})
+
+    def test_read_tarea_matches_model_serializer(self):
+        homeworks = Homework.objects.filter(status__in=['C', 'P']).order_by('id')
+        expected = self.legacy_content(HomeworkSerializer(homeworks, many=True).data)
+
+        response = self.client.get(reverse('read-tarea'), HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.content, expected)
+
+    def test_read_user_matches_model_serializer(self):
+        expected = self.legacy_content(UserSerializer(User.objects.order_by('id'), many=True).data)
+
+        response = self.client.get(reverse('read-user'), HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.content, expected)
+
+    def test_renderer_matches_drf(self):
+        data = {'time': datetime.time(9, 30, 0, 123456), 'items': [1, None, True], 1: 'texto ñ'}
+        self.assertEqual(JSONRenderer().render(data, 'application/json', {}),
+                         renderers.JSONRenderer().render(data, 'application/json', {}))
+        self.assertEqual(JSONRenderer().render(data, 'application/json; indent=2', {}),
+                         renderers.JSONRenderer().render(data, 'application/json; indent=2', {}))
+
+
+class SchemaTests(TareasTestCase):
+    def setUp(self):
+        super().setUp()
+        load_schema.cache_clear()
+        self.addCleanup(load_schema.cache_clear)
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        self.output_dir = output_dir.name
+
+    def test_schema_is_generated_once_without_artifact(self):
+        with self.settings(OPENAPI_SCHEMA_DIR=self.output_dir):
+            with mock.patch('config.schema.generate_schema', wraps=generate_schema) as generate:
+                first = self.client.get('/swagger.json')
+                second = self.client.get('/swagger.json')
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertIn('/read-tarea/', json.loads(first.content)['paths'])
+
+    def test_artifact_is_served_when_present(self):
+        call_command('generate_schema', '--output-dir', self.output_dir, stdout=StringIO())
+        with self.settings(OPENAPI_SCHEMA_DIR=self.output_dir):
+            with mock.patch('config.schema.generate_schema') as generate:
+                response = self.client.get('/swagger.yaml')
+
+        generate.assert_not_called()
+        self.assertEqual(response['Content-Type'], 'application/yaml')
+        self.assertEqual(response.content, Path(self.output_dir, 'swagger.yaml').read_bytes())
+
+    def test_ui_points_to_static_schema(self):
+        response = self.client.get('/swagger/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/swagger.json', response.content.decode())
+
+    def test_urls_do_not_import_drf_yasg_views(self):
+        code = 'import django, sys; django.setup(); import config.urls; print("drf_yasg.views" in sys.modules)'
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings'}, cwd=settings.BASE_DIR).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+class BenchmarkTests(TareasTestCase):
+    def run_benchmark(self, p50_ms):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = Path(directory) / 'baseline.json'
+            baseline.write_text(json.dumps({'read-tarea': {'p50_ms': p50_ms}}))
+            out = StringIO()
+            # El comando arma su propia base de prueba; aquí usa la del test
+            with mock.patch.multiple('tareas.management.commands.benchmark', setup_test_environment=mock.DEFAULT,
+                                     teardown_test_environment=mock.DEFAULT, setup_databases=mock.DEFAULT,
+                                     teardown_databases=mock.DEFAULT):
+                call_command('benchmark', '--users', '2', '--tareas', '5', '--iterations', '3', '--warmup', '0',
+                             '--only', 'read-tarea', '--baseline', str(baseline), stdout=out, stderr=StringIO())
+            return out.getvalue()
+
+    def test_regression_against_baseline_fails(self):
+        with self.assertRaisesMessage(CommandError, 'read-tarea: p50'):
+            self.run_benchmark(p50_ms=1e-6)
+
+    def test_within_baseline_passes(self):
+        self.assertIn('Sin regresiones respecto a la línea base.', self.run_benchmark(p50_ms=1e6))
+
+
+class LoadTestTests(TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('read-tarea=5, create-tarea'), {'read-tarea': 5.0, 'create-tarea': 1.0})
+        with self.assertRaises(CommandError):
+            parse_mix('read-tareas=5')
+        with self.assertRaises(CommandError):
+            parse_mix('read-tarea=mucho')
+
+    def test_summarize_merges_clients(self):
+        client_stats = [
+            {'read-tarea': {'latencies': [0.01, 0.02], 'statuses': {200: 2}}},
+            {'read-tarea': {'latencies': [0.03], 'statuses': {200: 1}},
+             'create-tarea': {'latencies': [0.05, 0.07], 'statuses': {201: 1, 500: 1}}},
+        ]
+
+        summary = summarize(client_stats, duration=2)
+
+        self.assertEqual(summary['routes']['read-tarea']['requests'], 3)
+        self.assertEqual(summary['routes']['read-tarea']['throughput'], 1.5)
+        self.assertEqual(summary['routes']['create-tarea']['error_rate'], 0.5)
+        self.assertEqual(summary['routes']['create-tarea']['statuses'], {'201': 1, '500': 1})
+        self.assertEqual((summary['total']['requests'], summary['total']['errors']), (5, 1))
+
+    def test_runs_gunicorn_and_saves_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'loadtest.json'
+            call_command('loadtest', '--workers', '1', '2', '--clients', '2', '--duration', '0.5',
+                         '--users', '20', '--tareas', '40', '--output', str(output), stdout=StringIO())
+            results = json.loads(output.read_text())
+
+        self.assertEqual(set(results['runs']), {'1', '2'})
+        for run in results['runs'].values():
+            self.assertGreater(run['total']['requests'], 0)
+            self.assertEqual(run['total']['errors'], 0, run['routes'])
+            self.assertLessEqual(set(run['routes']), {pattern.name for pattern in urlpatterns})
+
+
+class SQLiteTransactionModeTests(TransactionTestCase):
+    def test_atomic_starts_with_begin_immediate(self):
+        self.assertEqual(connection.settings_dict['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                User.objects.exists()
+
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+
+def write_users(alias, rows, results):
+    """Proceso de ``SQLiteConcurrencyTests``: como create-user, cada transacción lee y luego escribe."""
+    errors = 0
+    for i in range(rows):
+        try:
+            with transaction.atomic(using=alias):
+                users = User.objects.using(alias)
+                users.filter(name=f'{os.getpid()}-{i}', active=False).exists()
+                users.create(name=f'{os.getpid()}-{i}')
+        except OperationalError:
+            errors += 1
+    connections[alias].close()
+    results.put(errors)
+
+
+class SQLiteConcurrencyTests(TestCase):
+    """Transacciones del ORM que leen y luego escriben la misma base SQLite a la vez."""
+    processes = 4
+    rows = 50
+
+    @contextlib.contextmanager
+    def file_database(self, transaction_mode):
+        """Base SQLite temporaria en un archivo, con los PRAGMAs de ``SQLITE_PRAGMAS`` y una fila."""
+        alias = 'concurrency'
+        with tempfile.TemporaryDirectory() as directory:
+            connections.settings[alias] = {
+                **connection.settings_dict,
+                'NAME': os.path.join(directory, 'concurrency.sqlite3'),
+                'OPTIONS': {'timeout': 5, 'transaction_mode': transaction_mode},
+                'TEST': {},
+            }
+            try:
+                with connections[alias].schema_editor() as editor:
+                    editor.create_model(User)
+                User.objects.using(alias).bulk_create([User(name='Ana')])
+                connections[alias].close()
+                yield alias
+            finally:
+                connections[alias].close()
+                del connections[alias]
+                del connections.settings[alias]
+
+    def interleave(self, transaction_mode):
+        """La primera lee, la segunda lee y escribe entera, y recién entonces la primera escribe.
+
+        Devuelve los errores de cada transacción.
+        """
+        with self.file_database(transaction_mode) as alias:
+            first_read, second_done = threading.Event(), threading.Event()
+            errors = {}
+
+            def read_then_write(name, before_write=None, after_read=None):
+                try:
+                    with transaction.atomic(using=alias):
+                        users = User.objects.using(alias)
+                        users.get(name__startswith='Ana')
+                        if after_read:
+                            after_read.set()
+                        if before_write:
+                            # Con BEGIN IMMEDIATE la segunda espera el bloqueo y no termina antes
+                            before_write.wait(0.5)
+                        users.update(last_name=name)
+                except OperationalError as exc:
+                    errors[name] = str(exc)
+                finally:
+                    connections[alias].close()
+
+            def second():
+                first_read.wait(5)
+                read_then_write('segunda')
+                second_done.set()
+
+            threads = [threading.Thread(target=read_then_write, args=('primera', second_done, first_read)),
+                       threading.Thread(target=second)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return errors
+
+    def test_writer_processes_do_not_hit_lock_errors(self):
+        # Como los workers de gunicorn: procesos aparte con su propia conexión
+        context = multiprocessing.get_context('fork')
+        with self.file_database('IMMEDIATE') as alias:
+            results = context.Queue()
+            workers = [context.Process(target=write_users, args=(alias, self.rows, results))
+                       for _ in range(self.processes)]
+            for worker in workers:
+                worker.start()
+            errors = sum(results.get(timeout=60) for _ in workers)
+            for worker in workers:
+                worker.join()
+
+            self.assertEqual(errors, 0)
+            self.assertEqual(User.objects.using(alias).count(), 1 + self.processes * self.rows)
+
+    def test_deferred_transactions_fail_without_waiting(self):
+        self.assertEqual(self.interleave(None), {'primera': 'database is locked'})
+
+    def test_immediate_transactions_wait_for_the_lock(self):
+        self.assertEqual(self.interleave('IMMEDIATE'), {})
+
+    def test_django_connections_get_the_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
@@ -0,0 +1,43 @@
+"""Calentamiento de los workers de gunicorn (ver ``gunicorn.conf.py``).
+
+``preload`` corre en el proceso maestro antes del fork: importa las vistas y
+serializers y compila las plantillas de correo para que los workers
+compartan esa memoria. ``warmup_worker``
+corre en cada worker recién creado y abre lo que no se puede heredar del
+maestro (la conexión a la base de datos, el caché), así la primera petición
+no paga el arranque en frío.
+"""
+from django.db import connections
+from django.urls import get_resolver
+
+from tareas.cache import get_list_version, LIST_DEPENDENCIES
+
+
+def preload():
+    # Resolver el URLconf importa tareas.api.views, serializer (con sus
+    # expresiones regulares ya compiladas) y los renderers.
+    get_resolver().url_patterns
+    import tareas.api.serializer  # noqa: F401
+    from tareas.notifications import compile_templates
+
+    compile_templates()
+
+
+def warmup_worker():
+    from tareas.models import User, Homework
+
+    preload()
+    # La primera conexión aplica los PRAGMAs de SQLite y la primera consulta
+    # carga el esquema; las lecturas dejan en caché las páginas de los índices.
+    for connection in connections.all():
+        connection.ensure_connection()
+    User.objects.filter(status=True).order_by('id').values('id').first()
+    Homework.objects.filter(status__in=['C', 'P']).order_by('id').values('id').first()
+
+    for name in {name for names in LIST_DEPENDENCIES.values() for name in names}:
+        get_list_version(name)
+
+
+def close_connections():
+    """Cierra las conexiones del maestro para que ningún worker herede un socket o archivo abierto."""
+    connections.close_all()